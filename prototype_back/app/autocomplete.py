@@ -0,0 +1,246 @@
+from fastapi import APIRouter, Query
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, Character
+from etag import CATALOG_CHARACTERS, get_catalog_version
+from bisect import bisect_left, insort
+from typing import Optional, List
+import asyncio
+import heapq
+import threading
+import unicodedata
+import os
+
+# 캐릭터 이름 자동완성용 인메모리 인덱스
+# 서버 시작 시 활성 캐릭터 이름을 한 번 읽어 만들고, 캐릭터 생성/수정/삭제 및 팔로우 시 증분 갱신한다.
+# 증분 갱신은 커밋한 캐릭터 카탈로그 버전(ETag와 같은 값)을 함께 받아 인덱스 버전을 따라가고,
+# 백그라운드 작업이 AUTOCOMPLETE_REFRESH_INTERVAL초마다 DB 버전과 비교해서
+# 다른 워커 프로세스의 변경으로 버전이 어긋났을 때만 인덱스를 다시 만든다 (요청 처리 중에는 다시 만들지 않음).
+# 조회는 정렬된 키 배열에서 이분 탐색으로 범위를 찾는다.
+
+router = APIRouter()
+
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 20
+
+# 접두사 범위가 이 개수보다 넓으면 상위 결과를 캐싱 (짧은 접두사, 흔한 이름 앞부분)
+TOP_CACHE_MIN_RANGE = 256
+TOP_CACHE_SIZE = 4096
+
+AUTOCOMPLETE_REFRESH_INTERVAL = float(os.getenv("AUTOCOMPLETE_REFRESH_INTERVAL", "5"))  # 카탈로그 버전 확인 주기 (초)
+
+# 한글 음절 분해 테이블 (초성 19, 중성 21, 종성 28)
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+CHOSEONG = ["ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+JUNGSEONG = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ",
+    "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"
+]
+JONGSEONG = [
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"
+]
+# 입력 중에 단독으로 들어오는 겹모음/겹받침 자모도 같은 규칙으로 분해
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+
+def jamo_key(text: str) -> str:
+    """
+    이름을 자동완성 키로 변환: 한글 음절은 자모로 풀고(겹모음/겹받침도 분리), 나머지는 소문자로.
+    입력 중인 '김ㅊ', '가ㅁ'이나 받침이 다음 음절로 넘어가기 전의 '감'(-> 가마)도 접두사로 일치한다.
+    """
+    result = []
+    for char in unicodedata.normalize("NFC", text).lower():
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_END:
+            offset = code - HANGUL_BASE
+            result.append(CHOSEONG[offset // (21 * 28)])
+            result.append(JUNGSEONG[(offset // 28) % 21])
+            result.append(JONGSEONG[offset % 28])
+        elif not char.isspace():
+            result.append(COMPOUND_JAMO.get(char, char))
+    return "".join(result)
+
+
+class AutocompleteIndex:
+    """
+    (자모 키, char_idx) 정렬 배열 + 접두사 범위 내 팔로워 수 상위 k개 선택.
+    범위가 넓은 접두사는 상위 결과를 캐싱하고, 해당 접두사에 속한 항목이 바뀔 때만 비운다.
+    동기 엔드포인트는 스레드풀에서 실행되므로 Lock으로 보호한다.
+    """
+    def __init__(self, max_limit: int = MAX_AUTOCOMPLETE_LIMIT):
+        self.max_limit = max_limit
+        self._keys = []  # 정렬된 (키, char_idx)
+        self._entries = {}  # char_idx -> (키, 이름, 팔로워 수)
+        self._top = {}  # 범위가 넓은 접두사 -> 상위 char_idx 리스트
+        self._lock = threading.Lock()
+        self.version = None  # 인덱스에 반영된 캐릭터 카탈로그 버전
+
+    def load(self, rows, version: Optional[int] = None):
+        """
+        (char_idx, 이름, 팔로워 수) 목록으로 인덱스 전체를 다시 만든다.
+        """
+        entries = {char_idx: (jamo_key(name), name, score or 0) for char_idx, name, score in rows}
+        keys = sorted((key, char_idx) for char_idx, (key, _, _) in entries.items())
+        with self._lock:
+            self._entries = entries
+            self._keys = keys
+            self._top = {}
+            self.version = version
+
+    def _advance(self, version: Optional[int]):
+        # 바로 다음 버전의 변경일 때만 버전을 따라간다.
+        # 사이에 다른 워커의 변경이 있었으면 버전을 그대로 두어 백그라운드 확인 때 다시 만든다.
+        if version is not None and self.version is not None and version == self.version + 1:
+            self.version = version
+
+    def _invalidate_top(self, key: str):
+        if not self._top:
+            return
+        for length in range(len(key) + 1):
+            self._top.pop(key[:length], None)
+
+    def _remove(self, char_idx: int):
+        entry = self._entries.pop(char_idx, None)
+        if entry is None:
+            return None
+        key = entry[0]
+        position = bisect_left(self._keys, (key, char_idx))
+        if position < len(self._keys) and self._keys[position] == (key, char_idx):
+            del self._keys[position]
+        self._invalidate_top(key)
+        return entry
+
+    def upsert(self, char_idx: int, name: str, score: Optional[int] = None, version: Optional[int] = None):
+        """
+        캐릭터 이름을 추가/변경. score를 생략하면 기존 팔로워 수를 유지한다.
+        version은 이 변경을 커밋한 캐릭터 카탈로그 버전 (bump_catalog_version 반환값).
+        """
+        with self._lock:
+            self._advance(version)
+            previous = self._remove(char_idx)
+            if score is None:
+                score = previous[2] if previous else 0
+            key = jamo_key(name)
+            self._entries[char_idx] = (key, name, score)
+            insort(self._keys, (key, char_idx))
+            self._invalidate_top(key)
+
+    def remove(self, char_idx: int, version: Optional[int] = None):
+        with self._lock:
+            self._advance(version)
+            self._remove(char_idx)
+
+    def adjust_score(self, char_idx: int, delta: int, version: Optional[int] = None):
+        """
+        팔로우/언팔로우 시 정렬 점수(팔로워 수) 갱신.
+        """
+        with self._lock:
+            self._advance(version)
+            entry = self._entries.get(char_idx)
+            if entry is None:
+                return
+            key, name, score = entry
+            self._entries[char_idx] = (key, name, score + delta)
+            self._invalidate_top(key)
+
+    def _top_ids(self, prefix: str, limit: int) -> List[int]:
+        cached = self._top.get(prefix)
+        if cached is not None:
+            return cached[:limit]
+
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix + "\uffff",))
+        if end - start > TOP_CACHE_MIN_RANGE:
+            if len(self._top) >= TOP_CACHE_SIZE:
+                self._top.clear()
+            self._top[prefix] = self._select_top(start, end, self.max_limit)
+            return self._top[prefix][:limit]
+        return self._select_top(start, end, limit)
+
+    def _select_top(self, start: int, end: int, limit: int) -> List[int]:
+        return [
+            char_idx for _, char_idx in heapq.nsmallest(
+                limit,
+                self._keys[start:end],
+                key=lambda item: (-self._entries[item[1]][2], self._entries[item[1]][1], item[1])
+            )
+        ]
+
+    def complete(self, prefix: str, limit: int = DEFAULT_AUTOCOMPLETE_LIMIT) -> List[dict]:
+        key = jamo_key(prefix)
+        if not key:
+            return []
+
+        limit = min(limit, self.max_limit)
+        with self._lock:
+            char_ids = self._top_ids(key, limit)
+            return [
+                {"id": char_idx, "name": self._entries[char_idx][1], "follower_count": self._entries[char_idx][2]}
+                for char_idx in char_ids
+            ]
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def build_autocomplete_index(db):
+    """
+    활성 캐릭터 이름으로 인덱스를 다시 만든다. 버전을 먼저 읽으므로 그 사이 변경이 있으면 다음 확인 때 다시 만든다.
+    """
+    version = get_catalog_version(db, CATALOG_CHARACTERS)
+    rows = db.query(Character.char_idx, Character.char_name, Character.follower_count).filter(
+        Character.is_active == True
+    ).all()
+    autocomplete_index.load(rows, version)
+    return rows
+
+
+def load_autocomplete_index():
+    """
+    활성 캐릭터 이름으로 자동완성 인덱스를 만든다 (서버 시작 시 호출).
+    """
+    db = SessionLocal()
+    try:
+        rows = build_autocomplete_index(db)
+        print(f"Autocomplete index loaded: {len(rows)} characters")
+    finally:
+        db.close()
+
+
+def refresh_autocomplete_index():
+    """
+    카탈로그 버전을 확인해서, 다른 워커의 변경으로 인덱스 버전과 달라졌으면 인덱스를 다시 만든다.
+    """
+    db = SessionLocal()
+    try:
+        if get_catalog_version(db, CATALOG_CHARACTERS) != autocomplete_index.version:
+            build_autocomplete_index(db)
+    except Exception as e:
+        print(f"Error refreshing autocomplete index: {e}")
+    finally:
+        db.close()
+
+
+async def refresh_autocomplete_periodically():
+    """
+    AUTOCOMPLETE_REFRESH_INTERVAL초마다 스레드풀에서 refresh_autocomplete_index를 실행 (서버 lifespan의 백그라운드 작업).
+    """
+    while True:
+        await asyncio.sleep(AUTOCOMPLETE_REFRESH_INTERVAL)
+        await run_in_threadpool(refresh_autocomplete_index)
+
+
+@router.get("/api/characters/autocomplete", response_model=List[dict])
+def autocomplete_characters(
+    prefix: str,
+    limit: int = Query(default=DEFAULT_AUTOCOMPLETE_LIMIT, ge=1, le=MAX_AUTOCOMPLETE_LIMIT)
+):
+    """
+    캐릭터 이름 접두사 자동완성 (팔로워 수 순 상위 limit개). DB를 읽지 않는다.
+    """
+    return autocomplete_index.complete(prefix, limit)
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+# 캐릭터 상세/카드 응답을 프로세스 메모리에 보관하는 캐시
+# 캐릭터 생성/수정/삭제 및 팔로우/언팔로우 시 즉시 무효화하고,
+# 다른 워커 프로세스에서 변경된 내용은 TTL이 지나면 반영된다.
+
+load_dotenv()
+
+CHARACTER_CACHE_SIZE = int(os.getenv("CHARACTER_CACHE_SIZE", "2048"))
+CHARACTER_CACHE_TTL = float(os.getenv("CHARACTER_CACHE_TTL", "300"))  # 초 단위
+
+
+class TTLCache:
+    """
+    최대 크기(LRU 방식 제거)와 만료 시간(TTL)을 가진 스레드 안전 캐시.
+    동기 엔드포인트는 스레드풀에서 실행되므로 Lock으로 보호한다.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# char_idx -> 캐릭터 상세 응답
+character_detail_cache = TTLCache("character_detail", CHARACTER_CACHE_SIZE, CHARACTER_CACHE_TTL)
+# char_idx -> 캐릭터 카드 응답
+character_card_cache = TTLCache("character_card", CHARACTER_CACHE_SIZE, CHARACTER_CACHE_TTL)
+# 목록 조회 조건 -> char_idx 리스트 (필드별/최신순 카드 목록)
+character_list_cache = TTLCache("character_list", 256, CHARACTER_CACHE_TTL)
+
+
+def invalidate_character(char_idx: int):
+    """
+    캐릭터 정보가 바뀌었을 때 호출. 해당 캐릭터 캐시와 목록 캐시를 비운다.
+    """
+    character_detail_cache.invalidate(char_idx)
+    character_card_cache.invalidate(char_idx)
+    character_list_cache.clear()
+
+
+def invalidate_followers(char_idx: int):
+    """
+    팔로우/언팔로우 시 호출. 팔로워 수가 포함된 상세 캐시만 비운다.
+    """
+    character_detail_cache.invalidate(char_idx)
+
+
+def with_base_url(payload: dict, base_url: str) -> dict:
+    """
+    캐시에는 이미지 경로를 '/static/파일명' 형태로 저장하고, 응답 시 요청 base URL을 붙인다.
+    캐시된 dict가 변경되지 않도록 복사본을 반환.
+    """
+    result = dict(payload)
+    if result.get("character_image"):
+        result["character_image"] = f"{base_url}{result['character_image']}"
+    return result
+
+
+def cache_stats() -> dict:
+    return {
+        cache.name: cache.stats()
+        for cache in (character_detail_cache, character_card_cache, character_list_cache)
+    }
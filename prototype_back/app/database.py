@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine, UniqueConstraint, Column, String, Text, DateTime, ForeignKey, Integer, Boolean, JSON, ARRAY, text, Index, and_
+from sqlalchemy import create_engine, UniqueConstraint, Column, String, Text, DateTime, ForeignKey, Integer, BigInteger, Boolean, JSON, text, Index, and_
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -14,6 +17,11 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 # SQLAlchemy 설정
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 비동기 핸들러용 엔진/세션 (같은 DB에 asyncpg 드라이버로 연결)
+# 커밋 후에도 응답 생성에 객체 속성을 쓰므로 expire_on_commit=False
+async_engine = create_async_engine(make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"))
+AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Users 테이블
@@ -40,8 +48,20 @@ class Character(Base):
     char_description = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
     is_active = Column(Boolean, server_default=text("true"), nullable=False)
+    # 최신 프롬프트를 가리키는 포인터 (char_prompts와 순환 참조이므로 use_alter 사용)
+    current_prompt_id = Column(
+        Integer,
+        ForeignKey("char_prompts.char_prompt_id", use_alter=True, name="fk_characters_current_prompt"),
+        nullable=True
+    )
+    # 팔로워 수 카운터 (팔로우/언팔로우 시 함께 증감)
+    follower_count = Column(Integer, server_default=text("0"), nullable=False)
+    # 검색용 문서 (이름/설명/성격/태그를 정규화해서 합친 문자열, pg_trgm GIN 인덱스 대상)
+    search_text = Column(Text, nullable=True)
+    # 검색 문서의 1-gram/2-gram 목록 (한글 두 글자 검색어용 GIN 인덱스 대상)
+    search_grams = Column(ARRAY(Text), nullable=True)
     nicknames = Column(
-        JSON,
+        JSONB,
         nullable=False,
         default=lambda: {30: "stranger", 70: "friend", 100: "best friend"}
 )
@@ -68,7 +88,7 @@ class Tag(Base):
     __tablename__ = "tags"
 
     tag_idx = Column(Integer, primary_key=True, autoincrement=True)
-    char_idx = Column(Integer, ForeignKey("characters.char_idx"), nullable=False)
+    char_idx = Column(Integer, ForeignKey("characters.char_idx"), nullable=False, index=True)
     tag_name = Column(String(50), nullable=False)
     tag_description = Column(Text, nullable=True)
     is_deleted = Column(Boolean, server_default=text("false"), nullable=False)
@@ -91,6 +111,33 @@ class ChatLog(Base):
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
 
+# 채팅방별 대화 요약 (kind: history = 프롬프트 토큰 예산 밖으로 밀려난 오래된 대화의 누적 요약, memory = 캐릭터의 사용자 기억 요약)
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+
+    chat_id = Column(String(50), ForeignKey("chat_rooms.chat_id"), primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    summary = Column(Text, nullable=False)
+    covered_until = Column(DateTime, nullable=True)  # 요약에 반영된 마지막 대화 시각
+    updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+
+# 채팅 메시지 (세션 종료 시 chat_logs와 함께 저장, 대화 기록 조회는 이 테이블에서 최근 N개만 읽는다)
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    message_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    chat_id = Column(String(50), ForeignKey("chat_rooms.chat_id"), nullable=False)
+    session_id = Column(String(50), nullable=False)
+    sender = Column(String(20), nullable=False)  # user / chatbot
+    message = Column(Text, nullable=False)
+    emotion = Column(String(20), nullable=True)  # 캐릭터 응답의 감정
+    favorability = Column(Integer, nullable=True)  # 캐릭터 응답 시점의 호감도
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_chat_messages_chat_id_created_at", "chat_id", "created_at"),
+    )
+
 # Images 테이블
 class Image(Base):
     __tablename__ = "images"
@@ -110,6 +157,10 @@ class ChatRoom(Base):
     favorability = Column(Integer, server_default=text("0"), nullable=False)
     user_unique_name = Column(String(50), nullable=True)
     user_introduction = Column(Text, nullable=True)
+    # 턴 처리 방식 (three_call / single_call, NULL이면 LangChain 서버의 TURN_MODE 설정 사용)
+    turn_mode = Column(String(20), nullable=True)
+    # 감정 분류기 캐시 사용 여부
+    classifier_cache = Column(Boolean, server_default=text("true"), nullable=False)
 
 # 파셜 인덱스 정의
 # is_active가 true일 경우에만, user_idx와 char_prompt_id 조합 유니크 적용
@@ -121,6 +172,9 @@ Index(
     postgresql_where=and_(ChatRoom.is_active == True)
 )
 
+# 목록 API keyset 페이지네이션용 인덱스 (created_at, char_idx 내림차순 정렬)
+Index("ix_characters_created_at_char_idx", Character.created_at, Character.char_idx)
+
 # ImageMapping 테이블
 class ImageMapping(Base):
     __tablename__ = "image_mapping"
@@ -140,7 +194,7 @@ class CharacterPrompt(Base):
     character_personality = Column(Text, nullable=False)
     character_background = Column(Text, nullable=False)
     character_speech_style = Column(Text, nullable=False)
-    example_dialogues = Column(ARRAY(Text), nullable=True)
+    example_dialogues = Column(JSONB, nullable=True)  # 예시 대화 dict 리스트
 
 # GroupChats 테이블
 class GroupChat(Base):
@@ -169,7 +223,7 @@ class Friend(Base):
 
     friend_idx = Column(Integer, primary_key=True, autoincrement=True)
     user_idx = Column(Integer, ForeignKey("users.user_idx"), nullable=False)
-    char_idx = Column(Integer, ForeignKey("characters.char_idx"), nullable=False)
+    char_idx = Column(Integer, ForeignKey("characters.char_idx"), nullable=False, index=True)
     is_active = Column(Boolean, server_default=text("true"), nullable=False)
 
 # SecretDiary 테이블
@@ -190,6 +244,14 @@ class GroupChatCharacter(Base):
     char_idx = Column(Integer, ForeignKey("characters.char_idx"), nullable=False)
     
 
+# 카탈로그 버전 테이블 (캐릭터/태그/음성/필드 변경 시 증가, ETag 생성에 사용)
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, server_default=text("0"), nullable=False)
+
+
 # 캐릭터 이미지 생성 프롬프트
 class ImagePrompt(Base):
     __tablename__ = "images_prompts"
@@ -0,0 +1,67 @@
+from fastapi import Request, Response
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from database import CatalogVersion
+from typing import Dict
+import hashlib
+
+# 카탈로그 버전 기반 ETag / 조건부 GET(If-None-Match) 처리
+# 데이터가 바뀌는 트랜잭션에서 버전을 올리고, 조회 시에는 버전 한 행만 읽어 304 여부를 판단한다.
+
+CATALOG_CHARACTERS = "characters"
+CATALOG_TAGS = "tags"
+CATALOG_VOICES = "voices"
+CATALOG_FIELDS = "fields"
+
+
+def bump_catalog_version(db: Session, *names: str) -> Dict[str, int]:
+    """
+    카탈로그 버전을 1 증가 (행이 없으면 생성). 데이터 변경과 같은 트랜잭션에서 호출해야 한다.
+    증가한 버전을 카탈로그 이름별로 반환한다 (커밋 후 인메모리 인덱스 버전 갱신용).
+    """
+    versions = {}
+    for name in names:
+        statement = insert(CatalogVersion).values(name=name, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CatalogVersion.name],
+            set_={"version": CatalogVersion.version + 1}
+        ).returning(CatalogVersion.version)
+        versions[name] = db.execute(statement).scalar()
+    return versions
+
+
+def get_catalog_version(db: Session, name: str) -> int:
+    version = db.query(CatalogVersion.version).filter(CatalogVersion.name == name).scalar()
+    return version or 0
+
+
+def make_etag(name: str, version: int, request: Request) -> str:
+    """
+    카탈로그 버전과 요청(호스트, 쿼리 파라미터)으로 strong ETag 생성.
+    같은 버전이라도 페이지/필드 조건이나 이미지 URL 호스트가 다르면 다른 ETag가 된다.
+    """
+    variant = f"{request.base_url.netloc}?{'&'.join(sorted(str(request.query_params).split('&')))}"
+    digest = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:16]
+    return f'"{name}-v{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match 헤더에 현재 ETag가 포함되어 있는지 확인 (GET이므로 약한 비교).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def check_catalog_etag(db: Session, request: Request, name: str):
+    """
+    현재 카탈로그 버전의 ETag를 반환. 클라이언트가 같은 ETag를 가지고 있으면 304 응답도 함께 반환.
+    반환값: (etag, 304 응답 또는 None)
+    """
+    etag = make_etag(name, get_catalog_version(db, name), request)
+    if etag_matches(request, etag):
+        return etag, Response(status_code=304, headers={"ETag": etag})
+    return etag, None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import Column, String, ForeignKey, PrimaryKeyConstraint, text
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -12,6 +12,9 @@ import os
 from dotenv import load_dotenv
 from jose import jwt, JWTError
 from database import SessionLocal, Friend, Character, User
+from character_cache import invalidate_followers
+from autocomplete import autocomplete_index
+from etag import CATALOG_CHARACTERS, bump_catalog_version
 
 # .env 파일 로드
 load_dotenv()
@@ -38,6 +41,51 @@ def get_db():
     finally:
         db.close()
 
+# friends 테이블 기준 실제 팔로워 수와 카운터가 다른 캐릭터만 일괄 갱신하고 변경 내역을 반환
+RECONCILE_FOLLOWER_COUNTS_SQL = text("""
+    WITH actual AS (
+        SELECT c.char_idx, COUNT(f.friend_idx) AS follower_count
+        FROM characters AS c
+        LEFT JOIN friends AS f ON f.char_idx = c.char_idx AND f.is_active = true
+        GROUP BY c.char_idx
+    ),
+    drifted AS (
+        SELECT c.char_idx, c.follower_count AS stored_count, a.follower_count AS actual_count
+        FROM characters AS c
+        JOIN actual AS a ON a.char_idx = c.char_idx
+        WHERE c.follower_count <> a.follower_count
+    )
+    UPDATE characters AS c
+    SET follower_count = d.actual_count
+    FROM drifted AS d
+    WHERE c.char_idx = d.char_idx
+    RETURNING c.char_idx, d.stored_count, d.actual_count
+""")
+
+
+def change_follower_count(db: Session, char_idx: int, delta: int):
+    """
+    캐릭터 팔로워 수 카운터를 DB에서 원자적으로 증감.
+    Friend 변경과 같은 트랜잭션에서 커밋해야 한다.
+    """
+    db.query(Character).filter(Character.char_idx == char_idx).update(
+        {Character.follower_count: Character.follower_count + delta},
+        synchronize_session=False
+    )
+
+
+def reconcile_follower_counts(db) -> list:
+    """
+    팔로워 수 카운터를 friends 테이블 기준으로 일괄 재계산.
+    값이 달랐던(drift) 캐릭터 목록을 반환하며, 커밋은 호출한 쪽에서 처리한다.
+    """
+    rows = db.execute(RECONCILE_FOLLOWER_COUNTS_SQL).fetchall()
+    return [
+        {"char_idx": char_idx, "stored_count": stored_count, "actual_count": actual_count}
+        for char_idx, stored_count, actual_count in rows
+    ]
+
+
 class FollowRequest(BaseModel):
     user_idx: int
     char_idx: int
@@ -65,7 +113,11 @@ async def add_character_to_user(
 
         new_follow = Friend(user_idx=request.user_idx, char_idx=request.char_idx)
         db.add(new_follow)
+        change_follower_count(db, request.char_idx, 1)
+        versions = bump_catalog_version(db, CATALOG_CHARACTERS)
         db.commit()
+        invalidate_followers(request.char_idx)
+        autocomplete_index.adjust_score(request.char_idx, 1, version=versions[CATALOG_CHARACTERS])
         return {"message": f"캐릭터 {request.char_idx}가 유저 {request.user_idx}에게 추가되었습니다."}
 
     except Exception as e:
@@ -89,3 +141,17 @@ async def get_characters_for_user(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+
+
+# 팔로워 수 정합성 점검 작업 (python follow.py 로 실행)
+if __name__ == "__main__":
+    with SessionLocal() as db:
+        drift = reconcile_follower_counts(db)
+        db.commit()
+
+    if drift:
+        print(f"팔로워 수 불일치 캐릭터 {len(drift)}개를 보정했습니다.")
+        for row in drift:
+            print(f"  char_idx={row['char_idx']}: {row['stored_count']} -> {row['actual_count']}")
+    else:
+        print("팔로워 수 불일치가 없습니다.")
@@ -0,0 +1,186 @@
+from dotenv import load_dotenv
+from typing import AsyncIterator, Dict, List, Optional
+import websockets
+import asyncio
+import random
+import json
+import uuid
+import os
+
+# LangChain 서버와의 WebSocket 연결 풀
+# 채팅 메시지마다 새 연결을 여는 대신 소수의 연결을 유지하고, request_id로 요청/응답을 짝지어
+# 여러 채팅방의 요청이 같은 연결을 동시에 사용한다 (LangChain 서버의 /ws/mux/ 엔드포인트).
+# 스트리밍 요청은 같은 request_id로 delta 프레임 여러 개와 마지막 final 프레임을 받는다.
+
+load_dotenv()
+
+WS_SERVER_DOMAIN = os.getenv("WS_SERVER_DOMAIN")
+LANGCHAIN_POOL_SIZE = int(os.getenv("LANGCHAIN_POOL_SIZE", "4"))
+LANGCHAIN_REQUEST_TIMEOUT = float(os.getenv("LANGCHAIN_REQUEST_TIMEOUT", "60"))  # 초 단위
+
+# 헬스 체크: websockets의 ping/pong으로 응답 없는 연결을 감지하면 연결을 닫고 재연결한다.
+LANGCHAIN_PING_INTERVAL = 20
+LANGCHAIN_PING_TIMEOUT = 20
+
+# 재연결 지수 백오프 (초)
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+
+
+class LangChainConnection:
+    """
+    LangChain 서버와의 WebSocket 연결 하나. 끊어지면 백오프 후 자동으로 다시 연결한다.
+    응답 프레임은 request_id별 Queue로 전달된다.
+    """
+    def __init__(self, uri: str, name: str):
+        self.uri = uri
+        self.name = name
+        self.websocket = None
+        self.pending: Dict[str, asyncio.Queue] = {}  # request_id -> 응답 프레임 Queue
+        self.connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.websocket:
+            await self.websocket.close()
+        self._fail_pending(ConnectionError("LangChain 연결 풀이 종료되었습니다."))
+
+    async def _run(self):
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(
+                    self.uri,
+                    ping_interval=LANGCHAIN_PING_INTERVAL,
+                    ping_timeout=LANGCHAIN_PING_TIMEOUT
+                ) as websocket:
+                    self.websocket = websocket
+                    self.connected.set()
+                    attempt = 0
+                    print(f"LangChain connection {self.name} established")
+                    await self._read_loop(websocket)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"LangChain connection {self.name} error: {str(e)}")
+            finally:
+                self.connected.clear()
+                self.websocket = None
+                self._fail_pending(ConnectionError("LangChain 서버와의 연결이 끊어졌습니다."))
+
+            delay = min(RECONNECT_BASE_DELAY * (2 ** attempt), RECONNECT_MAX_DELAY)
+            attempt += 1
+            await asyncio.sleep(delay + random.uniform(0, delay / 10))
+
+    async def _read_loop(self, websocket):
+        async for raw in websocket:
+            message = json.loads(raw)
+            queue = self.pending.get(message.get("request_id"))
+            if queue is not None:
+                queue.put_nowait(message)
+
+    def _fail_pending(self, error: Exception):
+        pending, self.pending = self.pending, {}
+        for queue in pending.values():
+            queue.put_nowait(error)
+
+    async def frames(self, room_id: str, payload: dict, timeout: float, stream: bool = False) -> AsyncIterator[dict]:
+        """
+        요청을 보내고 응답 프레임을 차례로 내보낸다. 일반 요청은 프레임 하나, 스트리밍 요청은 final 프레임까지.
+        timeout은 프레임 사이의 최대 대기 시간.
+        """
+        websocket = self.websocket
+        if websocket is None:
+            raise ConnectionError("LangChain 서버와 연결되어 있지 않습니다.")
+
+        request_id = uuid.uuid4().hex
+        queue = asyncio.Queue()
+        self.pending[request_id] = queue
+        try:
+            await websocket.send(json.dumps({"request_id": request_id, "room_id": room_id, "payload": payload, "stream": stream}))
+            while True:
+                frame = await asyncio.wait_for(queue.get(), timeout)
+                if isinstance(frame, Exception):
+                    raise frame
+                yield frame
+                if not stream or frame.get("type") == "final":
+                    return
+        finally:
+            self.pending.pop(request_id, None)
+
+
+class LangChainPool:
+    """
+    LangChainConnection 여러 개를 관리. 요청은 연결된 소켓 중 대기 요청이 가장 적은 곳으로 보낸다.
+    """
+    def __init__(self, uri: str, size: int = LANGCHAIN_POOL_SIZE, timeout: float = LANGCHAIN_REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self.connections: List[LangChainConnection] = [
+            LangChainConnection(uri, f"#{index}") for index in range(size)
+        ]
+
+    async def start(self):
+        for connection in self.connections:
+            connection.start()
+
+    async def close(self):
+        for connection in self.connections:
+            await connection.close()
+
+    async def _acquire(self, timeout: float) -> LangChainConnection:
+        connected = [connection for connection in self.connections if connection.connected.is_set()]
+        if connected:
+            return min(connected, key=lambda connection: len(connection.pending))
+
+        # 모두 재연결 중이면 먼저 연결되는 소켓을 기다린다
+        waiters = [asyncio.create_task(connection.connected.wait()) for connection in self.connections]
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        if not done:
+            raise ConnectionError("사용 가능한 LangChain 연결이 없습니다.")
+        return await self._acquire(timeout)
+
+    async def request(self, room_id: str, payload: dict, timeout: Optional[float] = None) -> dict:
+        """
+        요청을 보내고 응답을 기다린다. 시간 초과 시 asyncio.TimeoutError, 연결 문제 시 ConnectionError.
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        connection = await self._acquire(timeout)
+        # 연결을 기다리느라 시간을 모두 썼으면 timeout 0으로 보내지 않고 연결 문제로 처리
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise ConnectionError("LangChain 연결을 기다리는 동안 요청 시간이 초과되었습니다.")
+        frames = connection.frames(room_id, payload, remaining)
+        try:
+            return await frames.__anext__()
+        finally:
+            await frames.aclose()
+
+    async def stream(self, room_id: str, payload: dict, timeout: Optional[float] = None) -> AsyncIterator[dict]:
+        """
+        스트리밍 요청. delta 프레임들과 마지막 final 프레임을 내보낸다.
+        timeout은 첫 프레임 및 프레임 사이의 최대 대기 시간.
+        """
+        timeout = timeout or self.timeout
+        connection = await self._acquire(timeout)
+        async for frame in connection.frames(room_id, payload, timeout, stream=True):
+            yield frame
+
+
+langchain_pool = LangChainPool(f"{WS_SERVER_DOMAIN}/ws/mux/")
@@ -1,22 +1,23 @@
 from fastapi import FastAPI, Depends, HTTPException, APIRouter, Query, Body # FastAPI 프레임워크 및 종속성 주입 도구
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.sql.expression import case
-from sqlalchemy import select,cast,String
+from sqlalchemy import select,cast,String,update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Session # SQLAlchemy 세션 관리
 
-from database import SessionLocal, ChatRoom, Character, CharacterPrompt, Voice, ChatLog, Field as DBField, Image, ImageMapping, Tag, Image, ImageMapping, Friend
+from database import SessionLocal, AsyncSessionLocal, ChatRoom, Character, CharacterPrompt, Voice, ChatLog, ChatMessage, Field as DBField, Image, ImageMapping, Tag, Image, ImageMapping, Friend
 
  # DB 세션과 모델 가져오기
-from typing import List, Optional # 데이터 타입 리스트 지원
+from typing import List, Optional, Literal # 데이터 타입 리스트 지원
 from pydantic import BaseModel # 데이터 검증 및 스키마 생성용 Pydantic 모델
 import uuid # 고유 ID 생성을 위한 UUID 라이브러리
 from datetime import datetime # 날짜 및 시간 처리
 from fastapi.middleware.cors import CORSMiddleware # CORS 설정용 미들웨어
-import re
 import websockets
 import asyncio
 from pathlib import Path  # 파일 경로 조작을 위한 모듈
+from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 
 
@@ -34,15 +35,47 @@ import os
 import user
 import wordcloud_router
 import search
+from search import refresh_search_text, search_index
 import image
+import autocomplete
+from autocomplete import autocomplete_index
+from follow import change_follower_count
+from character_cache import character_detail_cache, character_card_cache, character_list_cache, invalidate_character, invalidate_followers, with_base_url, cache_stats
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, paginate, parse_projection, wants, project, project_item
+from streaming import json_stream_response
+from langchain_client import langchain_pool
+from etag import CATALOG_CHARACTERS, CATALOG_TAGS, CATALOG_VOICES, CATALOG_FIELDS, bump_catalog_version, check_catalog_etag
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작/종료 시 실행할 작업.
+    """
+    # 캐릭터 이름 자동완성 인덱스 생성 (이후에는 캐릭터 변경 시 증분 갱신)
+    autocomplete.load_autocomplete_index()
+    # 다른 워커의 캐릭터 변경을 반영하는 자동완성 인덱스 버전 확인 작업
+    autocomplete_refresh = asyncio.create_task(autocomplete.refresh_autocomplete_periodically())
+    # LangChain 서버 WebSocket 연결 풀 시작/종료
+    await langchain_pool.start()
+    try:
+        yield
+    finally:
+        autocomplete_refresh.cancel()
+        try:
+            await autocomplete_refresh
+        except asyncio.CancelledError:
+            pass
+        await langchain_pool.close()
 
 
 # FastAPI 앱 초기화
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(user.router)
 app.include_router(wordcloud_router.router, prefix="/api", tags=["WordCloud"])
 app.include_router(search.router, tags=["Search"])
+app.include_router(autocomplete.router, tags=["Search"])
 app.include_router(image.router, tags=["Images"])
 
 # 이미지 경로 - OS 따라 경로 변하는 이슈로 인해 os 패키지 사용 (김민식)
@@ -92,6 +125,15 @@ def get_db():
     finally:
         db.close()
 
+
+# 비동기 DB 세션 관리 (async 핸들러용, 동기 핸들러는 get_db 사용)
+async def get_async_db():
+    """
+    비동기 데이터베이스 세션을 생성하고 반환.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # ====== Pydantic 스키마 ======
 ## 스키마 사용 이유
 
@@ -108,6 +150,8 @@ class CreateRoomSchema(BaseModel):
     character_id: int
     user_unique_name: Optional[str] = None
     user_introduction: Optional[str] = None
+    turn_mode: Optional[Literal["three_call", "single_call"]] = None  # 없으면 LangChain 서버 기본 설정 사용
+    classifier_cache: bool = True  # 짧은 메시지의 감정 분석 결과 캐시 사용 여부
 
     class Config:
         orm_mode = True
@@ -222,7 +266,7 @@ def get_rabbitmq_channel(req_que, res_que):
 
 # ====== API 엔드포인트 ======
 
-from fastapi import File, UploadFile, Form, Request
+from fastapi import File, UploadFile, Form, Request, Response
 from fastapi.staticfiles import StaticFiles
 
 UPLOAD_DIR = "./uploads/characters/"  # 캐릭터 이미지 파일 저장 경로
@@ -236,24 +280,10 @@ def create_chat_room(room: CreateRoomSchema, db: Session = Depends(get_db)):
     try:
         # 트랜잭션 시작
         with db.begin():
-            # 각 캐릭터에 대한 최신 char_prompt_id를 가져오는 subquery
-            subquery = (
-                select(
-                    CharacterPrompt.char_idx,
-                    func.max(CharacterPrompt.created_at).label("latest_created_at")
-                )
-                .group_by(CharacterPrompt.char_idx)
-                .subquery()
-            )
             # 캐릭터 정보 가져오기
             character_data = (
                 db.query(Character, CharacterPrompt)
-                .join(subquery, subquery.c.char_idx == Character.char_idx)
-                .join(
-                    CharacterPrompt,
-                    (CharacterPrompt.char_idx == subquery.c.char_idx) &
-                    (CharacterPrompt.created_at == subquery.c.latest_created_at)
-                )
+                .join(CharacterPrompt, CharacterPrompt.char_prompt_id == Character.current_prompt_id)
                 .filter(
                     Character.char_idx == room.character_id, 
                     Character.is_active == True
@@ -299,6 +329,8 @@ def create_chat_room(room: CreateRoomSchema, db: Session = Depends(get_db)):
                 char_prompt_id=prompt.char_prompt_id,
                 user_unique_name=room.user_unique_name,
                 user_introduction=room.user_introduction,
+                turn_mode=room.turn_mode,
+                classifier_cache=room.classifier_cache,
             )
             
             db.add(new_room)
@@ -321,76 +353,112 @@ def create_chat_room(room: CreateRoomSchema, db: Session = Depends(get_db)):
         db.rollback()  # 트랜잭션 롤백
         raise HTTPException(status_code=500, detail=f"채팅방 생성 중 오류가 발생했습니다: {str(e)}")
 
-# 채팅방 목록 조회 API
-@app.get("/api/chat-room/", response_model=List[dict])
-def get_all_chat_rooms(request: Request, db: Session = Depends(get_db)):
+# 채팅방 목록에서 프롬프트 테이블을 읽어야 하는 응답 필드
+ROOM_PROMPT_FIELDS = {
+    "character_appearance", "character_personality",
+    "character_background", "character_speech_style"
+}
+
+
+def room_list_query(db: Session, projection, user_idx: Optional[int] = None):
     """
-    모든 채팅방 목록을 반환하는 API 엔드포인트.
-    각 채팅방에 연결된 캐릭터 정보 및 이미지를 포함.
+    채팅방 목록 쿼리 (캐릭터, 이미지 포함). 프롬프트 필드가 필요한 경우에만 프롬프트 컬럼을 읽는다.
     """
-    rooms = (
-        db.query(ChatRoom, Character, CharacterPrompt, Image.file_path)
+    query = (
+        db.query(ChatRoom, Character, Image.file_path)
         .join(CharacterPrompt, CharacterPrompt.char_prompt_id == ChatRoom.char_prompt_id)
         .join(Character, Character.char_idx == CharacterPrompt.char_idx)
         .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
         .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
         .filter(Character.is_active == True, ChatRoom.is_active == True)
-        .all()
     )
+    if user_idx is not None:
+        query = query.filter(ChatRoom.user_idx == user_idx)
+    if wants(projection, ROOM_PROMPT_FIELDS):
+        query = query.add_entity(CharacterPrompt)
+    return query
 
-    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}"
-    result = []
-    for room, character, prompt, image_path in rooms:
-        # 이미지 경로를 URL로 변환
-        image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
-        result.append({
-            "room_id": room.chat_id,
-            "character_name": character.char_name,
-            "char_description": character.char_description,
+
+def serialize_room(row, base_url: str, projection) -> dict:
+    room, character, image_path = row.ChatRoom, row.Character, row.file_path
+    prompt = getattr(row, "CharacterPrompt", None)
+    # 이미지 경로를 URL로 변환
+    image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
+    item = {
+        "room_id": room.chat_id,
+        "character_name": character.char_name,
+        "char_description": character.char_description,
+        "room_created_at": room.created_at,
+        "character_image": image_url,  # 전체 URL 반환
+    }
+    if prompt:
+        item.update({
             "character_appearance": prompt.character_appearance,
             "character_personality": prompt.character_personality,
             "character_background": prompt.character_background,
             "character_speech_style": prompt.character_speech_style,
-            "room_created_at": room.created_at,
-            "character_image": image_url,  # 전체 URL 반환
         })
-    return result
+    return project_item(item, projection)
+
+
+def build_room_list(query, request: Request, response: Response, cursor, limit, projection):
+    """
+    채팅방 목록 쿼리에 chat_id 기준 keyset 페이지네이션을 적용해 응답을 만든다.
+    """
+    rows = apply_keyset(query, [ChatRoom.chat_id], cursor, limit).all()
+    rows = paginate(rows, limit, response, lambda row: (row.ChatRoom.chat_id,))
+
+    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}"
+    return [serialize_room(row, base_url, projection) for row in rows]
+
+
+# 채팅방 목록 조회 API
+@app.get("/api/chat-room/", response_model=List[dict])
+def get_all_chat_rooms(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+    stream: bool = Query(default=False),
+    db: Session = Depends(get_db)
+):
+    """
+    모든 채팅방 목록을 반환하는 API 엔드포인트.
+    각 채팅방에 연결된 캐릭터 정보 및 이미지를 포함.
+    chat_id 기준 cursor 페이지네이션을 사용하며 다음 페이지 cursor는 X-Next-Cursor 헤더로 전달.
+    stream=true이면 전체 목록을 서버 측 커서로 읽으면서 JSON 배열로 스트리밍한다 (관리자용, cursor/limit 무시).
+    """
+    projection = parse_projection(fields)
+
+    if stream:
+        base_url = f"{request.base_url.scheme}://{request.base_url.netloc}"
+        return json_stream_response(
+            lambda stream_db: room_list_query(stream_db, projection).order_by(ChatRoom.chat_id),
+            lambda row: serialize_room(row, base_url, projection)
+        )
+
+    return build_room_list(room_list_query(db, projection), request, response, cursor, limit, projection)
 
 
 # 특정 유저가 생성한 채팅방 목록 조회 API
 @app.get("/api/chat-room/user/{user_idx}", response_model=List[dict])
-def get_user_chat_rooms(user_idx: int, request: Request, db: Session = Depends(get_db)):
+def get_user_chat_rooms(
+    user_idx: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db)
+):
     """
     특정 사용자가 생성한 채팅방 목록을 반환하는 API 엔드포인트.
     각 채팅방에 연결된 캐릭터 정보 및 이미지를 포함.
     """
-    rooms = (
-        db.query(ChatRoom, Character, CharacterPrompt, Image.file_path)
-        .join(CharacterPrompt, CharacterPrompt.char_prompt_id == ChatRoom.char_prompt_id)
-        .join(Character, Character.char_idx == CharacterPrompt.char_idx)
-        .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
-        .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
-        .filter(ChatRoom.user_idx == user_idx, Character.is_active == True, ChatRoom.is_active == True)
-        .all()
-    )
-
-    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}"
-    result = []
-    for room, character, prompt, image_path in rooms:
-        # 이미지 경로를 URL로 변환
-        image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
-        result.append({
-            "room_id": room.chat_id,
-            "character_name": character.char_name,
-            "char_description": character.char_description,
-            "character_appearance": prompt.character_appearance,
-            "character_personality": prompt.character_personality,
-            "character_background": prompt.character_background,
-            "character_speech_style": prompt.character_speech_style,
-            "room_created_at": room.created_at,
-            "character_image": image_url,  # 이미지 URL 반환
-        })
-    return result
+    projection = parse_projection(fields)
+    query = room_list_query(db, projection, user_idx=user_idx)
+    return build_room_list(query, request, response, cursor, limit, projection)
 
 
 # 채팅 메시지 불러오기
@@ -415,6 +483,34 @@ def get_chat_logs(room_id: str, db: Session = Depends(get_db)):
         for log in logs
     ]
 
+
+@app.get("/api/chat/{room_id}/messages", response_model=List[dict])
+def get_chat_messages(
+    room_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    채팅방의 최근 메시지 limit개를 시간순으로 반환 ((chat_id, created_at) 인덱스로 최신순 조회).
+    더 이전 메시지가 있으면 X-Next-Cursor 헤더의 cursor로 이어서 조회한다.
+    """
+    query = db.query(ChatMessage).filter(ChatMessage.chat_id == room_id)
+    rows = apply_keyset(query, [ChatMessage.created_at, ChatMessage.message_id], cursor, limit, descending=True).all()
+    rows = paginate(rows, limit, response, lambda message: (message.created_at, message.message_id))
+    return [
+        {
+            "session_id": message.session_id,
+            "sender": message.sender,
+            "content": message.message,
+            "emotion": message.emotion,
+            "favorability": message.favorability,
+            "timestamp": message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for message in reversed(rows)
+    ]
+
 # 채팅방에서 캐릭터 정보 불러오기
 @app.get("/api/chat-room-info/{room_id}")
 def get_chat_room_info(room_id: str, db: Session = Depends(get_db)):
@@ -462,45 +558,24 @@ def get_chat_room_info(room_id: str, db: Session = Depends(get_db)):
 # ----------------------------------------확인 필요----------------------------------------
 # 채팅 전송 및 캐릭터 응답 - LangChain 서버 이용
 
-def get_chat_history(db: Session, room_id: str, limit: int = 10) -> str:
+def persona_version(char_prompt_id: int, current_prompt_id: Optional[int]) -> str:
     """
-    채팅방의 최근 대화 내역을 가져옵니다.
+    LangChain 서버 페르소나 캐시 버전 (persona_cache.persona_version과 같은 형식).
+    채팅방 프롬프트와 캐릭터 최신 프롬프트가 같으면 페르소나가 바뀌지 않은 것으로 본다.
     """
-    logs = db.query(ChatLog).filter(
-        ChatLog.chat_id == room_id
-    ).order_by(ChatLog.end_time.desc()).limit(limit).all()
-    
-    # 시간순으로 정렬
-    logs = logs[::-1]
-    
-    # 대화 내역을 문자열로 포맷팅
-    history = ""
-    for log in logs:
-        # ChatLog의 log 필드에서 대화 내용 파싱
-        log_lines = log.log.split('\n')
-        for line in log_lines:
-            if 'user:' in line or 'chatbot:' in line:
-                history += line + '\n'
-    
-    return history
+    return f"{char_prompt_id}:{current_prompt_id}"
 
 async def send_to_langchain(request_data: dict, room_id: str):
     """
     LangChain WebSocket 서버에 데이터를 전송하고 응답을 반환.
     """
     try:
-        uri = f"{WS_SERVER_DOMAIN}/ws/generate/?room_id={room_id}"
-        async with websockets.connect(uri) as websocket:
-            # 요청 데이터 전송
-            await websocket.send(json.dumps(request_data))
-            
-            # 서버 응답 수신
-            response = await websocket.recv()
-            return json.loads(response)
+        # 연결 풀의 공유 WebSocket으로 전송 (request_id로 응답을 구분)
+        return await langchain_pool.request(room_id, request_data)
     except asyncio.TimeoutError:
         print("WebSocket 응답 시간이 초과되었습니다.")
         raise HTTPException(status_code=504, detail="LangChain 서버 응답 시간 초과.")
-    except websockets.exceptions.ConnectionClosedError as e:
+    except (ConnectionError, websockets.exceptions.ConnectionClosed) as e:
         print(f"WebSocket closed with error: {str(e)}")
         raise HTTPException(status_code=500, detail="WebSocket 연결이 닫혔습니다.")
     except Exception as e:
@@ -508,55 +583,40 @@ async def send_to_langchain(request_data: dict, room_id: str):
         raise HTTPException(status_code=500, detail="LangChain 서버와 통신 중 오류가 발생했습니다.")
 
 # ----------------------------------------------------------------------------------------
+async def build_langchain_request(db: AsyncSession, room_id: str, message: MessageSchema):
+    """
+    LangChain 서버로 보낼 턴 요청 데이터를 만듭니다.
+    페르소나와 대화 기록은 LangChain 서버가 채팅방 기준으로 캐시/조회하므로 메시지, 호감도, 페르소나 버전만 보냅니다.
+    반환값: (채팅방, 요청 데이터)
+    """
+    result = await db.execute(
+        select(ChatRoom, Character.current_prompt_id)
+        .join(CharacterPrompt, ChatRoom.char_prompt_id == CharacterPrompt.char_prompt_id)
+        .join(Character, CharacterPrompt.char_idx == Character.char_idx)
+        .where(ChatRoom.chat_id == room_id, ChatRoom.is_active == True)
+    )
+    chat_data = result.first()
+
+    if not chat_data:
+        raise HTTPException(status_code=404, detail="해당 채팅방 정보를 찾을 수 없습니다.")
+
+    chat, current_prompt_id = chat_data
+
+    request_data = {
+        "user_message": message.content,
+        "favorability": chat.favorability, # 호감도
+        "persona_version": persona_version(chat.char_prompt_id, current_prompt_id) # 페르소나 캐시 버전
+    }
+    return chat, request_data
+
+
 @app.post("/api/chat/{room_id}")
-async def query_langchain(room_id: str, message: MessageSchema, db: Session = Depends(get_db)):
+async def query_langchain(room_id: str, message: MessageSchema, db: AsyncSession = Depends(get_async_db)):
     """
     LangChain 서버에 요청을 보내고 응답을 처리합니다.
     """
     try:
-        chat_data = (
-            db.query(ChatRoom, CharacterPrompt, Character)
-            .join(CharacterPrompt, ChatRoom.char_prompt_id == CharacterPrompt.char_prompt_id)
-            .join(Character, CharacterPrompt.char_idx == Character.char_idx)
-            .filter(ChatRoom.chat_id == room_id, ChatRoom.is_active == True)
-            .first()
-        )
-
-        if not chat_data:
-            raise HTTPException(status_code=404, detail="해당 채팅방 정보를 찾을 수 없습니다.")
-        
-        chat, prompt, character = chat_data
-
-        if prompt:
-            example_dialogues = [json.loads(clean_json_string(dialogue)) if dialogue else {} for dialogue in prompt.example_dialogues] if prompt.example_dialogues else []
-            nicknames = json.loads(character.nicknames) if character.nicknames else {'30': '', '70': '', '100': ''}
-        else:
-            # 기본값 설정
-            example_dialogues = []
-            nicknames = {'30': '', '70': '', '100': ''}
-
-        # --------------------대화 내역 가져오기--------------------
-        chat_history = get_chat_history(db, room_id)
-        print("Chat History being sent to LangChain:", chat_history)
-
-        # LangChain 서버로 보낼 요청 데이터 준비
-        request_data = {
-            "user_message": message.content,
-            "character_name": character.char_name, # 캐릭터 이름
-            "nickname": nicknames, # 호감도에 따른 호칭 명
-            "user_unique_name": chat.user_unique_name, # 캐릭터가 사용자에게 부르는 이름 (nickname보다 우선순위)
-            "user_introduction": chat.user_introduction, # 캐릭터한테 사용자를 소개하는 글
-            "favorability": chat.favorability, # 호감도
-            "character_appearance": prompt.character_appearance, # 캐릭터 외형
-            "character_personality": prompt.character_personality, # 캐릭터 성격
-            "character_background": prompt.character_background, # 캐릭터 배경
-            "character_speech_style": prompt.character_speech_style, # 캐릭터 말투
-            "example_dialogues": example_dialogues, # 예시 대화
-            "chat_history": chat_history # 채팅 기록
-        }
-        print("Full request data:", request_data)  # 로그 추가
-
-        print("Sending request to LangChain:", request_data)  # 디버깅용
+        chat, request_data = await build_langchain_request(db, room_id, message)
 
         # LangChain 서버와 WebSocket 통신
         response_data = await send_to_langchain(request_data, room_id)
@@ -568,7 +628,7 @@ async def query_langchain(room_id: str, message: MessageSchema, db: Session = De
         # 캐릭터 상태 업데이트
         chat.favorability = updated_favorability
         # 데이터베이스에 업데이트된 호감도 반영
-        db.commit()
+        await db.commit()
         # room.character_emotion = predicted_emotion (기분은 어떻게???)
 
         return {
@@ -582,16 +642,70 @@ async def query_langchain(room_id: str, message: MessageSchema, db: Session = De
         print(f"Error in query_langchain: {str(e)}")  # 디버깅용
         raise HTTPException(status_code=500, detail=str(e))
 
+
+async def save_favorability(room_id: str, favorability: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ChatRoom).where(ChatRoom.chat_id == room_id).values(favorability=favorability)
+        )
+        await db.commit()
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/chat/{room_id}/stream")
+async def stream_langchain(room_id: str, message: MessageSchema, db: AsyncSession = Depends(get_async_db)):
+    """
+    LangChain 응답을 SSE(text/event-stream)로 스트리밍합니다.
+    delta 이벤트로 응답 텍스트 조각을 보내고, 마지막 final 이벤트로 전체 응답과 감정/호감도를 보냅니다.
+    오류 시 error 이벤트를 보내고 종료합니다.
+    """
+    chat, request_data = await build_langchain_request(db, room_id, message)
+    favorability = chat.favorability
+
+    async def events():
+        try:
+            async for frame in langchain_pool.stream(room_id, request_data):
+                if frame.get("type") == "delta":
+                    yield sse_event("delta", {"text": frame["delta"]})
+                    continue
+
+                if "error" in frame:
+                    yield sse_event("error", {"detail": frame["error"]})
+                    return
+
+                updated_favorability = frame.get("favorability", favorability)
+                await save_favorability(room_id, updated_favorability)
+                yield sse_event("final", {
+                    "user": message.content,
+                    "bot": frame.get("text", ""),
+                    "updated_favorability": updated_favorability,
+                    "emotion": frame.get("emotion", "Neutral")
+                })
+        except asyncio.TimeoutError:
+            print("WebSocket 응답 시간이 초과되었습니다.")
+            yield sse_event("error", {"detail": "LangChain 서버 응답 시간 초과."})
+        except Exception as e:
+            print(f"Error in stream_langchain: {str(e)}")
+            yield sse_event("error", {"detail": "LangChain 서버와 통신 중 오류가 발생했습니다."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # 캐릭터 생성 api
 @app.post("/api/characters/", response_model=CharacterResponseSchema)
 async def create_character(
     character_image: UploadFile = File(...),
     character_data: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        with db.begin():
-            print("Received character data:", character_data)  # 디버깅용 로그
+        async with db.begin():
             character_dict = json.loads(character_data)
             character = CreateCharacterSchema(**character_dict)
 
@@ -602,10 +716,10 @@ async def create_character(
                 voice_idx=character.voice_idx,
                 char_name=character.char_name,
                 char_description=character.char_description,
-                nicknames=json.dumps(character.nicknames)
+                nicknames=character.nicknames
             )
             db.add(new_character)
-            db.flush()  # `new_character.char_idx`를 사용하기 위해 flush 실행
+            await db.flush()  # `new_character.char_idx`를 사용하기 위해 flush 실행
             
             # 캐릭터 프롬프트 생성
             new_prompt = CharacterPrompt(
@@ -614,13 +728,14 @@ async def create_character(
                 character_personality=character.character_personality,
                 character_background=character.character_background,
                 character_speech_style=character.character_speech_style,
-                example_dialogues=(
-                    [json.dumps(dialogue, ensure_ascii=False) for dialogue in character.example_dialogues]
-                    if character.example_dialogues else None
-                ),
+                example_dialogues=character.example_dialogues or None,
             )
 
             db.add(new_prompt)
+            await db.flush()  # `new_prompt.char_prompt_id`를 사용하기 위해 flush 실행
+
+            # 최신 프롬프트 포인터 갱신
+            new_character.current_prompt_id = new_prompt.char_prompt_id
 
             # 이미지 파일 저장
             file_extension = character_image.filename.split(".")[-1]
@@ -635,7 +750,7 @@ async def create_character(
              # 이미지 테이블에 저장
             new_image = Image(file_path=file_path)
             db.add(new_image)
-            db.flush()  # `new_image.img_idx` 사용하기 위해 flush 실행
+            await db.flush()  # `new_image.img_idx` 사용하기 위해 flush 실행
             
             # 이미지와 캐릭터 매핑
             image_mapping = ImageMapping(
@@ -653,132 +768,188 @@ async def create_character(
                     )
                     db.add(new_tag)
 
+            await db.flush()
+            # 동기 헬퍼는 run_sync로 같은 트랜잭션에서 실행
+            search_document = await db.run_sync(refresh_search_text, new_character.char_idx)
+            versions = await db.run_sync(bump_catalog_version, CATALOG_CHARACTERS, CATALOG_TAGS)
+
         # 트랜잭션 커밋 (with 블록 종료 시 자동으로 커밋됨, 명시적으로 작성)
-        db.commit()
+        await db.commit()
+        await db.refresh(new_character)  # server_default(created_at) 값 로드
+        invalidate_character(new_character.char_idx)
+        autocomplete_index.upsert(new_character.char_idx, character.char_name, 0, version=versions[CATALOG_CHARACTERS])
+        search_index.add(new_character.char_idx, character.char_name, search_document)
 
         return CharacterResponseSchema(
             char_idx=new_character.char_idx,
             char_name=new_character.char_name,
             char_description=new_character.char_description,
             created_at=new_character.created_at.isoformat(),
-            nicknames=json.loads(new_character.nicknames),
+            nicknames=new_character.nicknames,
             character_appearance=new_prompt.character_appearance,
             character_personality=new_prompt.character_personality,
             character_background=new_prompt.character_background,
             character_speech_style=new_prompt.character_speech_style,
-            example_dialogues=[
-                json.loads(dialogue) for dialogue in new_prompt.example_dialogues
-            ] if new_prompt.example_dialogues else None,
+            example_dialogues=new_prompt.example_dialogues,
             character_image=file_path
         )
     except Exception as e:
         print(f"Error in create_character: {str(e)}")
-        db.rollback() # 트랜잭션 롤백
+        await db.rollback() # 트랜잭션 롤백
         raise HTTPException(status_code=500, detail=str(e))
 
-def clean_json_string(json_string):
-    if not json_string:
-        return json_string
-    return re.sub(r'[\x00-\x1F\x7F]', '', json_string)
+# 캐릭터 목록에서 프롬프트 테이블을 읽어야 하는 응답 필드
+CHARACTER_PROMPT_FIELDS = {
+    "character_appearance", "character_personality", "character_background",
+    "character_speech_style", "example_dialogues"
+}
 
-# 캐릭터 목록 조회 API
-@app.get("/api/characters/", response_model=List[dict])
-def get_characters(db: Session = Depends(get_db), request: Request = None):
-    # 각 캐릭터에 대한 최신 char_prompt_id를 가져오는 subquery
-    subquery = (
-        select(
-            CharacterPrompt.char_idx,
-            func.max(CharacterPrompt.created_at).label("latest_created_at")
+
+def with_character_prompt(query, projection):
+    """
+    프롬프트 필드가 필요한 경우에만 char_prompts를 join한다.
+    """
+    if wants(projection, CHARACTER_PROMPT_FIELDS):
+        query = (
+            query.add_entity(CharacterPrompt)
+            .join(CharacterPrompt, CharacterPrompt.char_prompt_id == Character.current_prompt_id)
         )
-        .group_by(CharacterPrompt.char_idx)
-        .subquery()
-    )
+    return query
+
+
+def character_page_query(query, cursor, limit, projection):
+    """
+    캐릭터 목록 쿼리에 (created_at, char_idx) 내림차순 keyset 페이지네이션을 적용.
+    """
+    return apply_keyset(with_character_prompt(query, projection), [Character.created_at, Character.char_idx], cursor, limit, descending=True)
 
-    # 캐릭터를 최신 프롬프트와 join하고 이미지 정보를 포함하는 query
+
+def character_prompt_fields(prompt) -> dict:
+    """
+    캐릭터 목록 응답 중 프롬프트 관련 필드를 만든다.
+    """
+    if prompt is None:
+        return {}
+    return {
+        "character_appearance": prompt.character_appearance,
+        "character_personality": prompt.character_personality,
+        "character_background": prompt.character_background,
+        "character_speech_style": prompt.character_speech_style,
+        "example_dialogues": prompt.example_dialogues or [],
+    }
+
+
+def catalog_query(db: Session, projection):
+    """
+    캐릭터 카탈로그 쿼리 (이미지 포함, 태그는 요청된 경우에만).
+    """
     query = (
-        db.query(Character, CharacterPrompt, Image.file_path)
-        .join(subquery, subquery.c.char_idx == Character.char_idx)
-        .join(
-            CharacterPrompt,
-            (CharacterPrompt.char_idx == subquery.c.char_idx) &
-            (CharacterPrompt.created_at == subquery.c.latest_created_at)
-        )
+        db.query(Character, Image.file_path)
         .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
         .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
         .filter(Character.is_active == True)  # is_active가 True인 캐릭터만 가져오기
     )
 
-    characters_info = query.all()
-    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
-    results = []
+    # 태그 목록은 각 캐릭터에 대해 상관 서브쿼리로 같은 쿼리 안에서 집계
+    # 캐릭터 수와 관계없이 단일 쿼리로 목록을 구성함 (팔로워 수는 characters.follower_count 카운터 사용)
+    if wants(projection, {"tags"}):
+        tags = (
+            select(
+                func.json_agg(
+                    func.json_build_object(
+                        "tag_name", Tag.tag_name,
+                        "tag_description", Tag.tag_description
+                    )
+                )
+            )
+            .where(Tag.char_idx == Character.char_idx, Tag.is_deleted == False)
+            .scalar_subquery()
+        )
+        query = query.add_columns(tags.label("tags"))
+    return query
 
-    for char, prompt, image_path in characters_info:
 
-        follower_count = (
-            db.query(func.count(Friend.friend_idx))
-            .filter(Friend.char_idx == char.char_idx, Friend.is_active == True)
-            .scalar()
-        )
-        print(f"Character: {char.char_name}, field_idx: {char.field_idx}, type: {type(char.field_idx)}")
-        if prompt:
-            example_dialogues = [json.loads(clean_json_string(dialogue)) if dialogue else {} for dialogue in prompt.example_dialogues] if prompt.example_dialogues else []
-            nicknames = json.loads(char.nicknames) if char.nicknames else {'30': '', '70': '', '100': ''}
-        else:
-            # 기본값 설정
-            example_dialogues = []
-            nicknames = {'30': '', '70': '', '100': ''}
+def serialize_catalog_row(row, base_url: str, projection) -> dict:
+    char, image_path = row.Character, row.file_path
+    nicknames = char.nicknames or {'30': '', '70': '', '100': ''}
 
-        # 이미지 URL 생성
-        image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
+    # 이미지 URL 생성
+    image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
 
-        tags = db.query(Tag).filter(
-            Tag.char_idx == char.char_idx,
-            Tag.is_deleted == False
-        ).all()
-        
-        tag_list = [{"tag_name": tag.tag_name, "tag_description": tag.tag_description} for tag in tags]
+    item = {
+        "char_idx": char.char_idx,
+        "char_name": char.char_name,
+        "char_description": char.char_description,
+        "created_at": char.created_at.isoformat(),
+        "nicknames": nicknames,
+        "character_image": image_url,
+        "field_idx": char.field_idx,
+        "follower_count": char.follower_count,
+    }
+    item.update(character_prompt_fields(getattr(row, "CharacterPrompt", None)))
+    if "tags" in row._fields:
+        item["tags"] = row.tags or []
+    return project_item(item, projection)
 
-        results.append({
-            "char_idx": char.char_idx,
-            "char_name": char.char_name,
-            "char_description": char.char_description,
-            "created_at": char.created_at.isoformat(),
-            "nicknames": nicknames,
-            "character_appearance": prompt.character_appearance if prompt else "",
-            "character_personality": prompt.character_personality if prompt else "",
-            "character_background": prompt.character_background if prompt else "",
-            "character_speech_style": prompt.character_speech_style if prompt else "",
-            "example_dialogues": example_dialogues,
-            "tags": tag_list,
-            "character_image": image_url,
-            "field_idx": char.field_idx,
-            "follower_count": follower_count
-        })
 
-    return results
+# 캐릭터 목록 조회 API
+@app.get("/api/characters/", response_model=List[dict])
+def get_characters(
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+    stream: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    """
+    캐릭터 목록을 (created_at, char_idx) 기준 최신순 cursor 페이지로 반환.
+    fields 파라미터로 응답 필드를 제한할 수 있음 (예: fields=char_idx,char_name,char_description,character_image).
+    stream=true이면 전체 목록을 서버 측 커서로 읽으면서 JSON 배열로 스트리밍한다 (cursor/limit 무시).
+    카탈로그 버전 기반 ETag를 내려주며, If-None-Match가 일치하면 목록 조회 없이 304를 반환한다.
+    """
+    etag, not_modified = check_catalog_etag(db, request, CATALOG_CHARACTERS)
+    if not_modified:
+        return not_modified
+
+    projection = parse_projection(fields)
+    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
+
+    if stream:
+        streaming_response = json_stream_response(
+            lambda stream_db: (
+                with_character_prompt(catalog_query(stream_db, projection), projection)
+                .order_by(Character.created_at.desc(), Character.char_idx.desc())
+            ),
+            lambda row: serialize_catalog_row(row, base_url, projection)
+        )
+        streaming_response.headers["ETag"] = etag
+        return streaming_response
+
+    response.headers["ETag"] = etag
+
+    rows = character_page_query(catalog_query(db, projection), cursor, limit, projection).all()
+    rows = paginate(rows, limit, response, lambda row: (row.Character.created_at, row.Character.char_idx))
+
+    return [serialize_catalog_row(row, base_url, projection) for row in rows]
 
 # 특정 유저가 생성한 캐릭터 목록 조회 API
 @app.get("/api/characters/user/{user_id}", response_model=List[dict])
-def get_characters(user_id: int, db: Session = Depends(get_db), request: Request = None):
-    # 각 캐릭터에 대한 최신 char_prompt_id를 가져오는 subquery
-    subquery = (
-        select(
-            CharacterPrompt.char_idx,
-            func.max(CharacterPrompt.created_at).label("latest_created_at")
-        )
-        .group_by(CharacterPrompt.char_idx)
-        .subquery()
-    )
+def get_characters(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
+    projection = parse_projection(fields)
 
-    # 캐릭터를 최신 프롬프트와 join하고 이미지 정보를 포함하는 query
+    # 캐릭터와 이미지 정보를 포함하는 query (프롬프트는 필요한 경우에만 join)
     query = (
-        db.query(Character, CharacterPrompt, Image.file_path)
-        .join(subquery, subquery.c.char_idx == Character.char_idx)
-        .join(
-            CharacterPrompt,
-            (CharacterPrompt.char_idx == subquery.c.char_idx) &
-            (CharacterPrompt.created_at == subquery.c.latest_created_at)
-        )
+        db.query(Character, Image.file_path)
         .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
         .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
         .filter(
@@ -787,36 +958,29 @@ def get_characters(user_id: int, db: Session = Depends(get_db), request: Request
         )
     )
 
-    characters_info = query.all()
+    rows = character_page_query(query, cursor, limit, projection).all()
+    rows = paginate(rows, limit, response, lambda row: (row.Character.created_at, row.Character.char_idx))
 
     base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
     results = []
-    for char, prompt, image_path in characters_info:
-        if prompt:
-            example_dialogues = [json.loads(clean_json_string(dialogue)) if dialogue else {} for dialogue in prompt.example_dialogues] if prompt.example_dialogues else []
-            nicknames = json.loads(char.nicknames) if char.nicknames else {'30': '', '70': '', '100': ''}
-        else:
-            # 기본값 설정
-            example_dialogues = []
-            nicknames = {'30': '', '70': '', '100': ''}
+    for row in rows:
+        char, image_path = row.Character, row.file_path
+        nicknames = char.nicknames or {'30': '', '70': '', '100': ''}
 
         # 이미지 URL 생성
         image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
 
-        results.append({
+        item = {
             "char_idx": char.char_idx,
             "char_name": char.char_name,
             "char_description": char.char_description,
             "created_at": char.created_at.isoformat(),
             "nicknames": nicknames,
-            "character_appearance": prompt.character_appearance if prompt else "",
-            "character_personality": prompt.character_personality if prompt else "",
-            "character_background": prompt.character_background if prompt else "",
-            "character_speech_style": prompt.character_speech_style if prompt else "",
-            "example_dialogues": example_dialogues,
             "character_image": image_url,
-        })
-    return results
+        }
+        item.update(character_prompt_fields(getattr(row, "CharacterPrompt", None)))
+        results.append(item)
+    return project(results, projection)
 
 # 캐릭터 필터링할때 사용하는 Query 파라미터
 def parse_fields(fields: Optional[str] = Query(default=None)):
@@ -832,6 +996,42 @@ def parse_fields(fields: Optional[str] = Query(default=None)):
 
 
 
+def build_character_card(char, image_path) -> dict:
+    """
+    캐릭터 카드 응답을 만든다. 캐시에 저장되므로 이미지는 base URL 없이 '/static/파일명'으로 둔다.
+    """
+    return {
+        "char_idx": char.char_idx,
+        "char_name": char.char_name,
+        "char_description": char.char_description,
+        "created_at": char.created_at.isoformat(),
+        "field_idx": char.field_idx,
+        "character_owner": char.character_owner,
+        "character_image": f"/static/{os.path.basename(image_path)}" if image_path else None,
+    }
+
+
+def get_cached_character_cards(list_key, query, base_url: str) -> List[dict]:
+    """
+    카드 목록을 캐시에서 조회. 목록(char_idx 순서)과 각 카드가 모두 캐시에 있으면 DB를 조회하지 않는다.
+    query는 (Character, Image.file_path) 행을 반환하는 목록 쿼리.
+    """
+    cards = None
+    char_idxs = character_list_cache.get(list_key)
+    if char_idxs is not None:
+        cards = [character_card_cache.get(char_idx) for char_idx in char_idxs]
+        if any(card is None for card in cards):
+            cards = None
+
+    if cards is None:
+        cards = [build_character_card(char, image_path) for char, image_path in query.all()]
+        for card in cards:
+            character_card_cache.set(card["char_idx"], card)
+        character_list_cache.set(list_key, [card["char_idx"] for card in cards])
+
+    return [with_base_url(card, base_url) for card in cards]
+
+
 # 캐릭터 목록 조회 API - 필드 기준 조회
 @app.get("/api/characters/field", response_model=List[CharacterCardResponseSchema])
 def get_characters_by_field(
@@ -857,30 +1057,11 @@ def get_characters_by_field(
     if fields:
         query = query.filter(Character.field_idx.in_(fields))
 
-    # limit 적용 및 데이터 가져오기
-    characters_info = query.limit(limit).all()
-
     # 요청 URL로부터 base URL 생성
     base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
 
-    # 결과 리스트 생성
-    results = []
-    for char, image_path in characters_info:
-        # 이미지 URL 생성
-        image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
-
-        # 결과에 추가
-        results.append({
-            "char_idx": char.char_idx,
-            "char_name": char.char_name,
-            "char_description": char.char_description,
-            "created_at": char.created_at.isoformat(),
-            "field_idx": char.field_idx,
-            "character_owner": char.character_owner,
-            "character_image": image_url,
-        })
-
-    return results
+    list_key = ("field", tuple(sorted(fields)) if fields else None, limit)
+    return get_cached_character_cards(list_key, query.limit(limit), base_url)
 
 
 # 캐릭터 목록 조회 API - 태그 기준 조회
@@ -901,14 +1082,22 @@ def get_characters_by_tag(
 
 # 캐릭터 목록 조회 API - 최근 생성 순 조회
 @app.get("/api/characters/new", response_model=List[CharacterCardResponseSchema])
-def get_new_characters(limit: Optional[int] = 10, db: Session = Depends(get_db)):
+def get_new_characters(limit: Optional[int] = 10, db: Session = Depends(get_db), request: Request = None):
     """
     최근 생성된 캐릭터를 조회합니다.
     limit 값이 없으면 기본적으로 10개의 데이터를 반환합니다.
     """
-    characters = db.query(Character).filter(Character.is_active == True).order_by(Character.created_at.desc()).limit(limit).all()
-    
-    return characters
+    query = (
+        db.query(Character, Image.file_path)
+        .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
+        .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
+        .filter(Character.is_active == True)
+        .order_by(Character.created_at.desc())
+        .limit(limit)
+    )
+    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
+
+    return get_cached_character_cards(("new", limit), query, base_url)
 
 # 캐릭터 삭제 API
 @app.delete("/api/characters/{char_idx}")
@@ -924,7 +1113,11 @@ def delete_character(char_idx: int, db: Session = Depends(get_db)):
 
     # 캐릭터 숨김 처리
     character.is_active = False
+    versions = bump_catalog_version(db, CATALOG_CHARACTERS, CATALOG_TAGS)
     db.commit()
+    invalidate_character(char_idx)
+    autocomplete_index.remove(char_idx, version=versions[CATALOG_CHARACTERS])
+    search_index.remove(char_idx)
     return {"message": f"캐릭터 {char_idx}이(가) 성공적으로 삭제되었습니다."}
 
 # 이미지 생성 요청 API
@@ -1059,18 +1252,28 @@ def get_tts_model(room_id: str, db: Session = Depends(get_db)):
     }
 
 @app.get("/api/voices/")
-def get_voices(db: Session = Depends(get_db)):
+def get_voices(response: Response, request: Request, db: Session = Depends(get_db)):
+    etag, not_modified = check_catalog_etag(db, request, CATALOG_VOICES)
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+
     voices = db.query(Voice).all()
     return [{"voice_idx": str(voice.voice_idx), "voice_speaker": voice.voice_speaker} for voice in voices]
 
 
 # 필드 항목 가져오기 API
 @app.get("/api/fields/")
-def get_fields(db: Session = Depends(get_db)):
+def get_fields(response: Response, request: Request, db: Session = Depends(get_db)):
     """
     필드 항목을 반환하는 API 엔드포인트.
     """
     try:
+        etag, not_modified = check_catalog_etag(db, request, CATALOG_FIELDS)
+        if not_modified:
+            return not_modified
+        response.headers["ETag"] = etag
+
         fields = db.query(DBField).all()  # DBField로 변경
         return [{"field_idx": field.field_idx, "field_category": field.field_category} for field in fields]
     except Exception as e:
@@ -1078,22 +1281,15 @@ def get_fields(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.get("/api/tags")
-def get_tags(db: Session = Depends(get_db)):
+def get_tags(response: Response, request: Request, db: Session = Depends(get_db)):
+    etag, not_modified = check_catalog_etag(db, request, CATALOG_TAGS)
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+
     tags = db.query(Tag).distinct(Tag.tag_name).all()
     return [{"tag_idx": tag.tag_idx, "tag_name": tag.tag_name} for tag in tags]
 
-@app.get("/api/fields/")
-def get_fields(db: Session = Depends(get_db)):
-    """
-    필드 항목을 반환하는 API 엔드포인트.
-    """
-    try:
-        fields = db.query(DBField).all()  # DBField는 필드 정보를 저장하는 테이블
-        return [{"field_idx": field.field_idx, "field_category": field.field_category} for field in fields]
-    except Exception as e:
-        print(f"Error in get_fields: {str(e)}")  # 에러 로그
-        raise HTTPException(status_code=500, detail="필드 데이터를 불러오는 중 오류가 발생했습니다.")
-    
 @app.post("/api/friends/follow", response_model=dict)
 def follow_character(
     user_idx: int = Body(...),
@@ -1117,7 +1313,11 @@ def follow_character(
             char_idx=char_idx
         )
         db.add(new_follow)
+        change_follower_count(db, char_idx, 1)
+        versions = bump_catalog_version(db, CATALOG_CHARACTERS)
         db.commit()
+        invalidate_followers(char_idx)
+        autocomplete_index.adjust_score(char_idx, 1, version=versions[CATALOG_CHARACTERS])
         return {"message": "성공적으로 팔로우했습니다."}
     except Exception as e:
         db.rollback()
@@ -1130,17 +1330,21 @@ def unfollow_character(
     db: Session = Depends(get_db)
 ):
     try:
-        follow = db.query(Friend).filter(
+        # 활성 상태인 팔로우만 조건부로 비활성화 (동시 요청 시 카운터가 중복 감소하지 않도록)
+        updated = db.query(Friend).filter(
             Friend.user_idx == user_idx,
             Friend.char_idx == char_idx,
             Friend.is_active == True
-        ).first()
+        ).update({Friend.is_active: False}, synchronize_session=False)
 
-        if not follow:
+        if not updated:
             raise HTTPException(status_code=404, detail="팔로우 관계를 찾을 수 없습니다.")
 
-        follow.is_active = False
+        change_follower_count(db, char_idx, -updated)
+        versions = bump_catalog_version(db, CATALOG_CHARACTERS)
         db.commit()
+        invalidate_followers(char_idx)
+        autocomplete_index.adjust_score(char_idx, -updated, version=versions[CATALOG_CHARACTERS])
         return {"message": "성공적으로 언팔로우했습니다."}
     except Exception as e:
         db.rollback()
@@ -1156,28 +1360,23 @@ def check_follow(user_idx: int, char_idx: int, db: Session = Depends(get_db)):
     return {"is_following": bool(follow)}
 
 @app.get("/api/friends/{user_idx}/characters", response_model=List[dict])
-def get_followed_characters(user_idx: int, db: Session = Depends(get_db), request: Request = None):
+def get_followed_characters(
+    user_idx: int,
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    request: Request = None
+):
     """
     특정 사용자가 팔로우한 캐릭터 목록을 반환하는 API 엔드포인트.
     """
-    subquery = (
-        select(
-            CharacterPrompt.char_idx,
-            func.max(CharacterPrompt.created_at).label("latest_created_at")
-        )
-        .group_by(CharacterPrompt.char_idx)
-        .subquery()
-    )
+    projection = parse_projection(fields)
 
     # Friend 테이블을 사용하여 특정 사용자가 팔로우한 캐릭터 조회
     query = (
-        db.query(Character, CharacterPrompt, Image.file_path)
-        .join(subquery, subquery.c.char_idx == Character.char_idx)
-        .join(
-            CharacterPrompt,
-            (CharacterPrompt.char_idx == subquery.c.char_idx) &
-            (CharacterPrompt.created_at == subquery.c.latest_created_at)
-        )
+        db.query(Character, Image.file_path)
         .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
         .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
         .join(Friend, Friend.char_idx == Character.char_idx)
@@ -1188,37 +1387,44 @@ def get_followed_characters(user_idx: int, db: Session = Depends(get_db), reques
         )
     )
 
-    followed_characters = query.all()
+    rows = character_page_query(query, cursor, limit, projection).all()
+    rows = paginate(rows, limit, response, lambda row: (row.Character.created_at, row.Character.char_idx))
     base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
     results = []
 
-    for char, prompt, image_path in followed_characters:
+    for row in rows:
+        char, image_path = row.Character, row.file_path
         image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
 
-        results.append({
+        item = {
             "char_idx": char.char_idx,
             "character_owner": char.character_owner,
             "char_name": char.char_name,
             "char_description": char.char_description,
             "created_at": char.created_at.isoformat(),
-            "character_appearance": prompt.character_appearance if prompt else "",
-            "character_personality": prompt.character_personality if prompt else "",
-            "character_background": prompt.character_background if prompt else "",
-            "character_speech_style": prompt.character_speech_style if prompt else "",
             "character_image": image_url,
-        })
+        }
+        item.update(character_prompt_fields(getattr(row, "CharacterPrompt", None)))
+        results.append(item)
 
-    return results
+    return project(results, projection)
 
 # 특정 캐릭터 조회
 @app.get("/api/characters/{char_idx}", response_model=dict)
 def get_character_by_id(char_idx: int, db: Session = Depends(get_db), request: Request = None):
     """
     특정 캐릭터 정보를 반환하는 API 엔드포인트 (이미지, 호칭, 필드값 포함).
+    자주 조회되는 캐릭터는 캐시에서 바로 응답한다.
     """
+    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
+
+    cached = character_detail_cache.get(char_idx)
+    if cached is not None:
+        return with_base_url(cached, base_url)
+
     character_data = (
         db.query(Character, CharacterPrompt, Image.file_path, DBField.field_category)
-        .join(CharacterPrompt, Character.char_idx == CharacterPrompt.char_idx)
+        .join(CharacterPrompt, CharacterPrompt.char_prompt_id == Character.current_prompt_id)
         .outerjoin(ImageMapping, ImageMapping.char_idx == Character.char_idx)
         .outerjoin(Image, Image.img_idx == ImageMapping.img_idx)
         .join(DBField, DBField.field_idx == Character.field_idx)
@@ -1226,21 +1432,15 @@ def get_character_by_id(char_idx: int, db: Session = Depends(get_db), request: R
         .first()
     )
 
-    follower_count = db.query(Friend).filter(Friend.char_idx == char_idx, Friend.is_active == True).count()
-
     if not character_data:
         raise HTTPException(status_code=404, detail="해당 캐릭터를 찾을 수 없습니다.")
-    
-    character, prompt, image_path, field_category = character_data
 
-    # 이미지 URL 생성
-    base_url = f"{request.base_url.scheme}://{request.base_url.netloc}" if request else ""
-    image_url = f"{base_url}/static/{os.path.basename(image_path)}" if image_path else None
+    character, prompt, image_path, field_category = character_data
 
-    # JSON으로 저장된 호칭을 파싱
-    nicknames = json.loads(character.nicknames) if character.nicknames else {}
+    # JSONB로 저장된 호칭
+    nicknames = character.nicknames or {}
 
-    return {
+    payload = {
         "char_idx": character.char_idx,
         "char_name": character.char_name,
         "char_description": character.char_description,
@@ -1254,11 +1454,15 @@ def get_character_by_id(char_idx: int, db: Session = Depends(get_db), request: R
             {"tag_name": tag.tag_name, "tag_description": tag.tag_description}
             for tag in db.query(Tag).filter(Tag.char_idx == character.char_idx, Tag.is_deleted == False).all()
         ],
-        "character_image": image_url,
+        # 이미지 경로 (응답 시 base URL을 붙임)
+        "character_image": f"/static/{os.path.basename(image_path)}" if image_path else None,
         "field_idx": character.field_idx,  # 필드 카테고리 추가
         "nicknames": nicknames,  # 호칭 정보 추가
-        "follower_count": follower_count
+        "follower_count": character.follower_count
     }
+    character_detail_cache.set(char_idx, payload)
+
+    return with_base_url(payload, base_url)
 
 # 특정 캐릭터 수정
 # -------------- user_idx 확인해야 함 --------------------------
@@ -1267,13 +1471,11 @@ async def update_character(
     char_idx: int,
     character_image: Optional[UploadFile] = None,
     character_data: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        print(f"Received character data for update: {character_data}")  # 로깅 추가
-        with db.begin():
+        async with db.begin():
             character_dict = json.loads(character_data)
-            print(f"Parsed character dict: {character_dict}")  # 로깅 추가
             
             # 필수 필드 확인
             required_fields = ['character_owner', 'field_idx', 'voice_idx', 'char_name', 'char_description']
@@ -1283,21 +1485,20 @@ async def update_character(
             
             # Pydantic 스키마 검증
             character = CreateCharacterSchema(**character_dict)
-            print(f"Created schema object: {character}")  # 로깅 추가
 
             # 기존 캐릭터 조회
-            existing_character = db.query(Character).filter(Character.char_idx == char_idx).first()
+            existing_character = (await db.execute(
+                select(Character).where(Character.char_idx == char_idx)
+            )).scalars().first()
             if not existing_character:
                 raise HTTPException(status_code=404, detail="캐릭터를 찾을 수 없습니다.")
 
-            print(f"Found existing character: {existing_character.char_idx}")  # 로깅 추가
-
             # 캐릭터 기본 정보 업데이트
             existing_character.field_idx = character.field_idx
             existing_character.voice_idx = character.voice_idx
             existing_character.char_name = character.char_name
             existing_character.char_description = character.char_description
-            existing_character.nicknames = json.dumps(character.nicknames)
+            existing_character.nicknames = character.nicknames
 
             # 새로운 프롬프트 생성
             new_prompt = CharacterPrompt(
@@ -1306,29 +1507,29 @@ async def update_character(
                 character_personality=character.character_personality,
                 character_background=character.character_background,
                 character_speech_style=character.character_speech_style,
-                example_dialogues=(
-                    [json.dumps(dialogue, ensure_ascii=False) for dialogue in character.example_dialogues]
-                    if character.example_dialogues else None
-                ),
+                example_dialogues=character.example_dialogues or None,
             )
             db.add(new_prompt)
-            print("Added new prompt")  # 로깅 추가
+            await db.flush()  # `new_prompt.char_prompt_id`를 사용하기 위해 flush 실행
+
+            # 최신 프롬프트 포인터 갱신 (같은 트랜잭션 안에서 처리)
+            existing_character.current_prompt_id = new_prompt.char_prompt_id
 
             # 이미지 업데이트 로직
             if character_image:
-                print("Updating character image...")  # 로깅 추가
-
                 # 기존 이미지 매핑 및 이미지 가져오기
-                existing_image_mapping = db.query(ImageMapping).filter(
-                    ImageMapping.char_idx == char_idx,
-                    ImageMapping.is_active == True
-                ).first()
+                existing_image_mapping = (await db.execute(
+                    select(ImageMapping).where(
+                        ImageMapping.char_idx == char_idx,
+                        ImageMapping.is_active == True
+                    )
+                )).scalars().first()
 
                 if existing_image_mapping:
                     # 기존 이미지 레코드를 가져옴
-                    existing_image = db.query(Image).filter(
-                        Image.img_idx == existing_image_mapping.img_idx
-                    ).first()
+                    existing_image = (await db.execute(
+                        select(Image).where(Image.img_idx == existing_image_mapping.img_idx)
+                    )).scalars().first()
 
                     if existing_image:
                         # 새 이미지 파일 저장
@@ -1343,7 +1544,6 @@ async def update_character(
 
                         # 기존 이미지 경로 교체
                         existing_image.file_path = file_path
-                        print("Image file path updated successfully.")  # 로깅 추가
 
                 else:
                     # 기존 이미지가 없는 경우 새 이미지 레코드를 생성
@@ -1358,7 +1558,7 @@ async def update_character(
 
                     new_image = Image(file_path=file_path)
                     db.add(new_image)
-                    db.flush()
+                    await db.flush()
 
                     # 새로운 이미지 매핑 추가
                     new_mapping = ImageMapping(
@@ -1370,10 +1570,8 @@ async def update_character(
 
             # 태그 업데이트
             if character.tags:
-                print("Updating tags")  # 로깅 추가
-
                 # 기존 태그 비활성화
-                existing_tags = db.query(Tag).filter(Tag.char_idx == char_idx).all()
+                existing_tags = (await db.execute(select(Tag).where(Tag.char_idx == char_idx))).scalars().all()
                 for tag in existing_tags:
                     tag.is_deleted = True
 
@@ -1385,9 +1583,16 @@ async def update_character(
                         tag_description=tag["tag_description"]
                     )
                     db.add(new_tag)
-                print("Successfully updated tags")  # 로깅 추가
 
-        db.commit()
+            await db.flush()
+            # 동기 헬퍼는 run_sync로 같은 트랜잭션에서 실행
+            search_document = await db.run_sync(refresh_search_text, char_idx)
+            versions = await db.run_sync(bump_catalog_version, CATALOG_CHARACTERS, CATALOG_TAGS)
+
+        await db.commit()
+        invalidate_character(char_idx)
+        autocomplete_index.upsert(char_idx, character.char_name, version=versions[CATALOG_CHARACTERS])
+        search_index.add(char_idx, character.char_name, search_document)
         return {"message": "캐릭터가 성공적으로 업데이트되었습니다."}
 
     except Exception as e:
@@ -1395,7 +1600,7 @@ async def update_character(
         print(f"Error type: {type(e)}")  # 에러 타입 출력
         import traceback
         print(f"Full traceback: {traceback.format_exc()}")  # 전체 스택 트레이스 출력
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
     
@@ -1538,6 +1743,11 @@ def get_top3_tags(user_idx: int, db: Session = Depends(get_db)):
         print(f"Error fetching top tags: {e}")
         raise HTTPException(status_code=500, detail="태그 데이터를 가져오는 중 오류가 발생했습니다.")
 
+# 캐릭터 캐시 상태 조회 API (적중/미적중 횟수)
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    return cache_stats()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
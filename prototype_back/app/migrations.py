@@ -0,0 +1,263 @@
+from sqlalchemy import text
+from database import engine, ChatMessage
+from datetime import datetime
+from follow import reconcile_follower_counts
+from search import document_grams
+import json
+import re
+
+# 기존 DB에 적용하는 마이그레이션 모음
+# create_all은 이미 존재하는 테이블을 변경하지 않으므로 컬럼 추가/백필은 여기서 처리
+# 모든 마이그레이션은 여러 번 실행해도 안전하게 작성 (python migrations.py 로 실행)
+
+# 대량 데이터 변환 시 한 번에 읽고 쓰는 행 수
+MIGRATION_BATCH_SIZE = 500
+
+
+def add_character_current_prompt(conn):
+    """
+    characters.current_prompt_id 컬럼을 추가하고 캐릭터별 최신 프롬프트로 채운다.
+    """
+    conn.execute(text("ALTER TABLE characters ADD COLUMN IF NOT EXISTS current_prompt_id INTEGER"))
+    conn.execute(text("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'fk_characters_current_prompt'
+            ) THEN
+                ALTER TABLE characters
+                    ADD CONSTRAINT fk_characters_current_prompt
+                    FOREIGN KEY (current_prompt_id) REFERENCES char_prompts (char_prompt_id);
+            END IF;
+        END $$;
+    """))
+
+    # 포인터가 비어있는 캐릭터만 가장 최근 프롬프트로 백필
+    conn.execute(text("""
+        UPDATE characters AS c
+        SET current_prompt_id = latest.char_prompt_id
+        FROM (
+            SELECT DISTINCT ON (char_idx) char_idx, char_prompt_id
+            FROM char_prompts
+            ORDER BY char_idx, created_at DESC, char_prompt_id DESC
+        ) AS latest
+        WHERE c.char_idx = latest.char_idx
+          AND c.current_prompt_id IS NULL
+    """))
+
+
+def add_list_indexes(conn):
+    """
+    목록 API 페이지네이션 및 캐릭터별 태그/팔로워 조회에 사용하는 인덱스 생성.
+    """
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_characters_created_at_char_idx ON characters (created_at, char_idx)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tags_char_idx ON tags (char_idx)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_friends_char_idx ON friends (char_idx)"))
+
+
+def add_character_follower_count(conn):
+    """
+    characters.follower_count 카운터 컬럼을 추가하고 friends 테이블 기준으로 채운다.
+    """
+    conn.execute(text("ALTER TABLE characters ADD COLUMN IF NOT EXISTS follower_count INTEGER NOT NULL DEFAULT 0"))
+    drift = reconcile_follower_counts(conn)
+    print(f"  follower_count updated for {len(drift)} characters")
+
+
+def clean_json_string(json_string):
+    if not json_string:
+        return json_string
+    return re.sub(r'[\x00-\x1F\x7F]', '', json_string)
+
+
+def column_type(conn, table: str, column: str):
+    return conn.execute(
+        text("SELECT data_type FROM information_schema.columns WHERE table_name = :table AND column_name = :column"),
+        {"table": table, "column": column}
+    ).scalar()
+
+
+def convert_json_columns_to_jsonb(conn):
+    """
+    characters.nicknames(JSON 문자열로 한 번 더 인코딩된 JSON)와
+    char_prompts.example_dialogues(JSON 문자열 배열)를 JSONB로 변환한다.
+    """
+    if column_type(conn, "characters", "nicknames") != "jsonb":
+        # json.dumps로 저장된 값은 JSON 문자열이므로 한 번 풀어서 JSONB로 변환
+        conn.execute(text("""
+            ALTER TABLE characters ALTER COLUMN nicknames TYPE JSONB USING (
+                CASE WHEN json_typeof(nicknames) = 'string'
+                     THEN (nicknames #>> '{}')::jsonb
+                     ELSE nicknames::jsonb
+                END
+            )
+        """))
+
+    if column_type(conn, "char_prompts", "example_dialogues") == "ARRAY":
+        conn.execute(text("ALTER TABLE char_prompts ADD COLUMN IF NOT EXISTS example_dialogues_jsonb JSONB"))
+
+        # 배열 원소마다 제어문자 제거 후 파싱이 필요하므로 서버 측 커서로 나눠 읽으며 변환
+        rows = conn.execute(
+            text("SELECT char_prompt_id, example_dialogues FROM char_prompts WHERE example_dialogues IS NOT NULL"),
+            execution_options={"stream_results": True, "yield_per": MIGRATION_BATCH_SIZE}
+        )
+        converted = 0
+        for batch in rows.partitions():
+            conn.execute(
+                text("UPDATE char_prompts SET example_dialogues_jsonb = CAST(:dialogues AS JSONB) WHERE char_prompt_id = :char_prompt_id"),
+                [
+                    {
+                        "char_prompt_id": char_prompt_id,
+                        "dialogues": json.dumps(
+                            [json.loads(clean_json_string(dialogue)) if dialogue else {} for dialogue in dialogues],
+                            ensure_ascii=False
+                        ),
+                    }
+                    for char_prompt_id, dialogues in batch
+                ]
+            )
+            converted += len(batch)
+        print(f"  example_dialogues converted for {converted} prompts")
+
+        conn.execute(text("ALTER TABLE char_prompts DROP COLUMN example_dialogues"))
+        conn.execute(text("ALTER TABLE char_prompts RENAME COLUMN example_dialogues_jsonb TO example_dialogues"))
+
+
+def add_character_search_text(conn):
+    """
+    characters.search_text 검색 문서 컬럼과 pg_trgm GIN 인덱스를 추가하고 기존 캐릭터를 채운다.
+    문서 형식은 search.build_search_text와 같아야 한다 (이름, 설명, 성격, 태그 순).
+    """
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text("ALTER TABLE characters ADD COLUMN IF NOT EXISTS search_text TEXT"))
+    result = conn.execute(text(r"""
+        UPDATE characters AS c
+        SET search_text = btrim(regexp_replace(lower(normalize(concat_ws(' ',
+            c.char_name,
+            c.char_description,
+            (SELECT p.character_personality FROM char_prompts AS p WHERE p.char_prompt_id = c.current_prompt_id),
+            (SELECT string_agg(t.tag_name, ' ' ORDER BY t.tag_idx) FROM tags AS t WHERE t.char_idx = c.char_idx AND NOT t.is_deleted)
+        ), NFC)), '\s+', ' ', 'g'))
+        WHERE c.search_text IS NULL
+    """))
+    print(f"  search_text filled for {result.rowcount} characters")
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_characters_search_text_trgm ON characters USING gin (search_text gin_trgm_ops)"
+    ))
+
+
+def add_character_search_grams(conn):
+    """
+    characters.search_grams n-gram 컬럼과 GIN 인덱스를 추가하고 search_text로 채운다.
+    n-gram은 search.document_grams와 같아야 하므로 Python에서 계산하며, 서버 측 커서로 나눠 읽는다.
+    """
+    conn.execute(text("ALTER TABLE characters ADD COLUMN IF NOT EXISTS search_grams TEXT[]"))
+    rows = conn.execute(
+        text("SELECT char_idx, search_text FROM characters WHERE search_grams IS NULL AND search_text IS NOT NULL"),
+        execution_options={"stream_results": True, "yield_per": MIGRATION_BATCH_SIZE}
+    )
+    filled = 0
+    for batch in rows.partitions():
+        conn.execute(
+            text("UPDATE characters SET search_grams = :search_grams WHERE char_idx = :char_idx"),
+            [{"char_idx": char_idx, "search_grams": document_grams(search_text)} for char_idx, search_text in batch]
+        )
+        filled += len(batch)
+    print(f"  search_grams filled for {filled} characters")
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_characters_search_grams ON characters USING gin (search_grams)"
+    ))
+
+
+def add_chat_room_turn_mode(conn):
+    """
+    chat_rooms.turn_mode 컬럼 추가 (채팅방별 LLM 턴 처리 방식, NULL이면 서버 기본값).
+    """
+    conn.execute(text("ALTER TABLE chat_rooms ADD COLUMN IF NOT EXISTS turn_mode VARCHAR(20)"))
+
+
+def add_chat_room_classifier_cache(conn):
+    """
+    chat_rooms.classifier_cache 컬럼 추가 (채팅방별 감정 분류기 캐시 사용 여부).
+    """
+    conn.execute(text(
+        "ALTER TABLE chat_rooms ADD COLUMN IF NOT EXISTS classifier_cache BOOLEAN NOT NULL DEFAULT true"
+    ))
+
+
+# 세션 로그의 메시지 줄: [YYYY-mm-dd HH:MM:SS] user|chatbot: 내용
+LOG_MESSAGE_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (user|chatbot): (.*)$")
+
+
+def parse_log_messages(log: str):
+    """
+    세션 로그를 (시각, 보낸 사람, 내용) 목록으로 나눈다. 여러 줄 메시지는 이어 붙인다.
+    """
+    messages = []
+    for line in log.splitlines():
+        match = LOG_MESSAGE_LINE.match(line)
+        if match:
+            created_at = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+            messages.append([created_at, match.group(2), match.group(3)])
+        elif messages and line and not line.startswith("Session "):
+            messages[-1][2] += "\n" + line
+    return messages
+
+
+def add_chat_messages(conn):
+    """
+    메시지 단위 chat_messages 테이블을 만들고 기존 chat_logs 세션 로그를 나눠 채운다.
+    이미 메시지가 있는 세션은 건너뛰며, 로그는 서버 측 커서로 나눠 읽는다.
+    """
+    ChatMessage.__table__.create(bind=conn, checkfirst=True)
+
+    rows = conn.execute(text("""
+        SELECT l.session_id, l.chat_id, l.log
+        FROM chat_logs AS l
+        WHERE NOT EXISTS (SELECT 1 FROM chat_messages AS m WHERE m.session_id = l.session_id)
+    """), execution_options={"stream_results": True, "yield_per": MIGRATION_BATCH_SIZE})
+    sessions = 0
+    inserted = 0
+    for batch in rows.partitions():
+        values = [
+            {
+                "chat_id": chat_id,
+                "session_id": session_id,
+                "sender": sender,
+                "message": message,
+                "created_at": created_at,
+            }
+            for session_id, chat_id, log in batch
+            for created_at, sender, message in parse_log_messages(log or "")
+        ]
+        if values:
+            conn.execute(ChatMessage.__table__.insert(), values)
+        sessions += len(batch)
+        inserted += len(values)
+    print(f"  chat_messages filled from {sessions} sessions ({inserted} messages)")
+
+
+# 실행 순서대로 나열
+MIGRATIONS = [
+    add_character_current_prompt,
+    add_list_indexes,
+    add_character_follower_count,
+    convert_json_columns_to_jsonb,
+    add_character_search_text,
+    add_character_search_grams,
+    add_chat_room_turn_mode,
+    add_chat_room_classifier_cache,
+    add_chat_messages,
+]
+
+
+def run_migrations():
+    for migration in MIGRATIONS:
+        print(f"Running migration: {migration.__name__}")
+        with engine.begin() as conn:
+            migration(conn)
+    print("All migrations applied.")
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,99 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, tuple_
+from datetime import datetime
+from typing import Optional, List, Set
+import base64
+import json
+
+# 목록 API 공통 페이지네이션(keyset/cursor) 및 필드 프로젝션 유틸
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# 다음 페이지 cursor는 응답 헤더로 전달 (응답 본문은 기존처럼 리스트 유지)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """
+    정렬 키 값들을 URL에 안전한 불투명 문자열로 인코딩.
+    """
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """
+    cursor 문자열을 정렬 컬럼 타입에 맞는 값 리스트로 디코딩.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if len(values) != len(columns):
+            raise ValueError("cursor 길이가 정렬 키와 일치하지 않습니다.")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+
+
+def apply_keyset(query, columns: list, cursor: Optional[str], limit: int, descending: bool = False):
+    """
+    정렬 컬럼 튜플 기준 keyset 조건과 정렬, limit(+1)을 쿼리에 적용.
+    다음 페이지 존재 여부 확인을 위해 limit보다 한 행 더 가져온다.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def paginate(rows: list, limit: int, response: Response, cursor_key) -> list:
+    """
+    limit+1개로 조회한 결과를 한 페이지로 자르고, 다음 페이지가 있으면 cursor 헤더를 설정.
+    cursor_key는 행에서 정렬 키 튜플을 꺼내는 함수.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*cursor_key(rows[-1]))
+    return rows
+
+
+def parse_projection(fields: Optional[str]) -> Optional[Set[str]]:
+    """
+    쉼표로 구분된 fields 파라미터를 응답 키 집합으로 변환 (없으면 전체 필드).
+    """
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(",") if field.strip()}
+
+
+def wants(projection: Optional[Set[str]], keys: Set[str]) -> bool:
+    """
+    프로젝션에 주어진 키 중 하나라도 포함되는지 여부 (프로젝션이 없으면 항상 True).
+    """
+    return projection is None or bool(projection & keys)
+
+
+def project_item(item: dict, projection: Optional[Set[str]]) -> dict:
+    """
+    응답 항목 하나에서 요청된 필드만 남긴다.
+    """
+    if projection is None:
+        return item
+    return {key: value for key, value in item.items() if key in projection}
+
+
+def project(items: List[dict], projection: Optional[Set[str]]) -> List[dict]:
+    """
+    응답 항목에서 요청된 필드만 남긴다.
+    """
+    if projection is None:
+        return items
+    return [project_item(item, projection) for item in items]
@@ -4,14 +4,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.future import select
-from fastapi import APIRouter, Depends, HTTPException, Body
+from sqlalchemy import case, func, or_, and_
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from typing import Optional
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 from jose import jwt, JWTError
-from database import SessionLocal, Character, User
+from database import SessionLocal, Character, CharacterPrompt, Tag, User
+from collections import defaultdict
+import threading
+import unicodedata
+import re
 
 
 # .env 파일 로드
@@ -28,6 +34,13 @@ if not DATABASE_URL:
 Base = declarative_base()
 router = APIRouter()
 
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+# 검색 문서 n-gram 길이 (characters.search_grams GIN 인덱스와 인메모리 색인 공통)
+# pg_trgm은 3-gram이라 두 글자 한글 검색어를 인덱스로 찾지 못하므로 2-gram을 따로 색인한다.
+NGRAM_SIZE = 2
+
 # DB 세션 관리
 def get_db():
     """
@@ -53,18 +66,255 @@ def get_character_by_index(character_idx: int, db: Session = Depends(get_db)):
     return {"id": character[0], "name": character[1], "description": character[2]}
 
 
+# ---------------------------------------------------------------------------
+# 검색 문서
+# ---------------------------------------------------------------------------
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """
+    검색어/문서 정규화: 유니코드 NFC(조합형 한글 통일), 소문자, 연속 공백 하나로.
+    """
+    if not value:
+        return ""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", value).lower()).strip()
+
+
+def build_search_text(char_name: str, char_description: str, character_personality: Optional[str], tag_names) -> str:
+    """
+    캐릭터 검색 문서 생성. migrations.py의 backfill SQL과 같은 순서/형식을 유지해야 한다.
+    """
+    return normalize_search_text(" ".join(
+        part for part in [char_name, char_description, character_personality, *tag_names] if part
+    ))
+
+
+def document_grams(document: str) -> list:
+    """
+    검색 문서의 n-gram 목록: 토큰별 1-gram과 2-gram (한 글자 검색어도 인덱스로 찾을 수 있게 1-gram 포함).
+    """
+    grams = set()
+    for token in document.split(" "):
+        grams.update(token)
+        grams.update(token[i:i + NGRAM_SIZE] for i in range(len(token) - NGRAM_SIZE + 1))
+    return sorted(grams)
+
+
+def query_grams(query: str) -> list:
+    """
+    검색어 n-gram 목록: 두 글자 이상 토큰은 2-gram, 한 글자 토큰은 그 글자.
+    검색어가 문서의 부분 문자열이면 이 n-gram은 모두 document_grams에 들어 있다.
+    """
+    grams = set()
+    for token in query.split(" "):
+        if len(token) < NGRAM_SIZE:
+            if token:
+                grams.add(token)
+            continue
+        grams.update(token[i:i + NGRAM_SIZE] for i in range(len(token) - NGRAM_SIZE + 1))
+    return sorted(grams)
+
+
+def refresh_search_text(db: Session, char_idx: int) -> Optional[str]:
+    """
+    캐릭터의 검색 문서와 n-gram을 다시 계산해서 저장 (캐릭터 생성/수정 트랜잭션 안에서 flush 이후 호출).
+    인메모리 색인은 커밋 이후에 반영해야 하므로 여기서 갱신하지 않고 검색 문서를 반환한다.
+    """
+    character = db.query(Character).filter(Character.char_idx == char_idx).first()
+    if not character:
+        return None
+
+    personality = None
+    if character.current_prompt_id:
+        personality = db.query(CharacterPrompt.character_personality).filter(
+            CharacterPrompt.char_prompt_id == character.current_prompt_id
+        ).scalar()
+    tag_names = [
+        tag_name for (tag_name,) in db.query(Tag.tag_name).filter(
+            Tag.char_idx == char_idx, Tag.is_deleted == False
+        ).order_by(Tag.tag_idx)
+    ]
+
+    character.search_text = build_search_text(
+        character.char_name, character.char_description, personality, tag_names
+    )
+    character.search_grams = document_grams(character.search_text)
+    return character.search_text
+
+
+def rank_match(query: str, char_name: str, document: str) -> float:
+    """
+    인메모리 색인용 관련도 점수: 이름 완전 일치 > 이름 접두사 > 이름 포함 > 문서 포함,
+    같은 등급 안에서는 문서에서 검색어가 차지하는 비율이 높을수록 앞에 온다.
+    """
+    name = normalize_search_text(char_name)
+    if name == query:
+        tier = 3
+    elif name.startswith(query):
+        tier = 2
+    elif query in name:
+        tier = 1
+    else:
+        tier = 0
+    return tier + len(query) / max(len(document), 1)
+
+
+# ---------------------------------------------------------------------------
+# 인메모리 n-gram 역색인 (SQLite 등 PostgreSQL이 아닌 환경용)
+# ---------------------------------------------------------------------------
+
+class NgramIndex:
+    """
+    n-gram -> char_idx 집합 역색인. 검색어 n-gram의 posting을 교집합해 후보를 만든 뒤
+    부분 문자열 일치로 확인하고 rank_match 점수로 정렬한다.
+    첫 검색 시 DB에서 활성 캐릭터를 읽어 만들고, 이후에는 생성/수정/삭제 트랜잭션이 커밋된 뒤 증분 갱신한다.
+    """
+    def __init__(self):
+        self.loaded = False
+        self._postings = defaultdict(set)
+        self._documents = {}  # char_idx -> (char_name, 검색 문서)
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        with self._lock:
+            if self.loaded:
+                return
+            rows = db.query(Character.char_idx, Character.char_name, Character.search_text).filter(
+                Character.is_active == True
+            )
+            for char_idx, char_name, document in rows:
+                self._add(char_idx, char_name, document or normalize_search_text(char_name))
+            self.loaded = True
+
+    def _add(self, char_idx: int, char_name: str, document: str):
+        self._remove(char_idx)
+        self._documents[char_idx] = (char_name, document)
+        for gram in document_grams(document):
+            self._postings[gram].add(char_idx)
+
+    def _remove(self, char_idx: int):
+        entry = self._documents.pop(char_idx, None)
+        if entry is None:
+            return
+        for gram in document_grams(entry[1]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(char_idx)
+                if not postings:
+                    del self._postings[gram]
+
+    def add(self, char_idx: int, char_name: str, document: Optional[str]):
+        """
+        커밋된 캐릭터 생성/수정 반영 (document는 refresh_search_text의 반환값).
+        """
+        with self._lock:
+            if self.loaded and document:
+                self._add(char_idx, char_name, document)
+
+    def remove(self, char_idx: int):
+        """
+        커밋된 캐릭터 삭제(숨김) 반영.
+        """
+        with self._lock:
+            if self.loaded:
+                self._remove(char_idx)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> list:
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in query_grams(query)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+
+            matches = []
+            for char_idx in candidates:
+                char_name, document = self._documents[char_idx]
+                if query in document:
+                    matches.append((rank_match(query, char_name, document), char_idx))
+
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [char_idx for _, char_idx in matches[offset:offset + limit]]
+
+
+search_index = NgramIndex()
+
+
+# ---------------------------------------------------------------------------
+# 검색 쿼리
+# ---------------------------------------------------------------------------
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_postgres(db: Session, query: str, limit: int, offset: int) -> list:
+    """
+    PostgreSQL 검색. 부분 문자열 일치는 n-gram GIN 인덱스(ix_characters_search_grams)로 후보를 찾은 뒤 ILIKE로 확인하고,
+    오타 허용 단어 유사도(%>)는 pg_trgm GIN 인덱스(ix_characters_search_text_trgm)로 찾는다.
+    이름 일치 등급 -> 단어 유사도 -> 팔로워 수 순으로 정렬한다.
+    """
+    escaped = escape_like(query)
+    pattern = f"%{escaped}%"
+    name_rank = case(
+        (func.lower(Character.char_name) == query, 3),
+        (Character.char_name.ilike(f"{escaped}%", escape="\\"), 2),
+        (Character.char_name.ilike(pattern, escape="\\"), 1),
+        else_=0
+    )
+    similarity = func.word_similarity(query, Character.search_text)
+
+    return (
+        db.query(Character.char_idx, Character.char_name, Character.char_description)
+        .filter(
+            Character.is_active == True,
+            or_(
+                and_(
+                    Character.search_grams.contains(query_grams(query)),
+                    Character.search_text.ilike(pattern, escape="\\")
+                ),
+                Character.search_text.op("%>")(query)
+            )
+        )
+        .order_by(name_rank.desc(), similarity.desc(), Character.follower_count.desc(), Character.char_idx)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def search_fallback(db: Session, query: str, limit: int, offset: int) -> list:
+    search_index.load(db)
+    char_ids = search_index.search(query, limit, offset)
+    if not char_ids:
+        return []
+
+    rows = {
+        row.char_idx: row
+        for row in db.query(Character.char_idx, Character.char_name, Character.char_description).filter(
+            Character.char_idx.in_(char_ids)
+        )
+    }
+    return [rows[char_idx] for char_idx in char_ids if char_idx in rows]
+
+
 @router.get("/api/characters/search", response_model=list)
-def search_characters(query: str, db: Session = Depends(get_db)):
+def search_characters(
+    query: str,
+    limit: int = Query(default=SEARCH_PAGE_SIZE, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db)
+):
     """
-    캐릭터 이름과 설명으로 검색해서 목록을 반환하는 API.
+    캐릭터 이름, 설명, 성격, 태그로 검색해서 관련도 순 목록을 반환하는 API.
+    limit/offset으로 페이지를 나눠서 조회한다.
     """
-    # 캐릭터 이름 또는 설명에 검색어가 포함된 캐릭터 찾기
-    characters = db.query(Character).filter(
-        (Character.char_name.like(f"%{query}%")) | 
-        (Character.char_description.like(f"%{query}%"))
-    ).all()
+    normalized = normalize_search_text(query)
+    if not normalized:
+        raise HTTPException(status_code=400, detail="검색어를 입력하세요.")
+
+    if db.bind.dialect.name == "postgresql":
+        characters = search_postgres(db, normalized, limit, offset)
+    else:
+        characters = search_fallback(db, normalized, limit, offset)
 
-    if not characters:
+    if not characters and offset == 0:
         raise HTTPException(status_code=404, detail="검색 결과가 없습니다.")
 
     return [
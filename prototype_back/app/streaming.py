@@ -0,0 +1,51 @@
+from fastapi.responses import StreamingResponse
+from database import SessionLocal
+import orjson
+
+# 큰 목록을 한 번에 메모리에 올리지 않고 JSON 배열로 조금씩 내려보내는 스트리밍 응답 유틸
+
+# 서버 측 커서에서 한 번에 가져오는 행 수이자, 한 번에 전송하는 항목 수
+STREAM_BATCH_SIZE = 500
+
+
+def iter_json_array(items, batch_size: int = STREAM_BATCH_SIZE):
+    """
+    dict 이터러블을 JSON 배열 바이트 조각으로 인코딩 (batch_size개씩 묶어서 전송).
+    datetime 등은 orjson이 ISO 형식으로 직렬화한다.
+    """
+    yield b"["
+    chunk = []
+    first = True
+    for item in items:
+        encoded = orjson.dumps(item)
+        chunk.append(encoded if first else b"," + encoded)
+        first = False
+        if len(chunk) >= batch_size:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+    yield b"]"
+
+
+def stream_query(build_query, serialize, batch_size: int = STREAM_BATCH_SIZE):
+    """
+    build_query(db)로 만든 쿼리를 서버 측 커서(yield_per)로 순회하며 serialize(row) 결과를 내보낸다.
+    응답 전송이 끝날 때까지 세션이 유지되어야 하므로 요청 의존성 세션 대신 별도 세션을 연다.
+    """
+    db = SessionLocal()
+    try:
+        for row in build_query(db).yield_per(batch_size):
+            yield serialize(row)
+    finally:
+        db.close()
+
+
+def json_stream_response(build_query, serialize, batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    쿼리 결과를 JSON 배열로 스트리밍하는 응답 생성.
+    """
+    return StreamingResponse(
+        iter_json_array(stream_query(build_query, serialize, batch_size), batch_size),
+        media_type="application/json"
+    )
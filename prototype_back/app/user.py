@@ -3,7 +3,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import Optional, List
@@ -14,6 +14,7 @@ from fastapi.security import OAuth2PasswordBearer
 import os
 import shutil
 from database import SessionLocal, User
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, paginate
 from dotenv import load_dotenv
 
 
@@ -140,10 +141,16 @@ def verify_token(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="유효하지 않은 토큰")
 
 @router.get("/users", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
+def get_all_users(
+    response: Response,
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     try:
-        # 모든 사용자 조회
-        users = db.query(User).all()
+        # user_idx 기준 cursor 페이지 단위로 사용자 조회 (다음 페이지 cursor는 X-Next-Cursor 헤더)
+        users = apply_keyset(db.query(User), [User.user_idx], cursor, limit).all()
+        users = paginate(users, limit, response, lambda user: (user.user_idx,))
         return [
             {
                 "user_idx": user.user_idx,
@@ -153,6 +160,8 @@ def get_all_users(db: Session = Depends(get_db)):
             }
             for user in users
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"사용자 목록 조회 중 오류: {e}")  # 디버깅용 로그
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {e}")
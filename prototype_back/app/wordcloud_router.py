@@ -15,7 +15,7 @@ import shutil
 from pydantic import BaseModel
 from sqlalchemy.ext.declarative import declarative_base
 import re
-from database import SessionLocal, ChatRoom, ChatLog
+from database import SessionLocal, ChatRoom, ChatMessage
 from collections import Counter
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
@@ -109,13 +109,12 @@ def generate_user_wordcloud(user_idx: int, db: Session = Depends(get_db)):
 
         chat_ids = [chat_id[0] for chat_id in chat_ids]  # 결과를 리스트로 변환
 
-        # chat_id에 해당하는 로그 가져오기
-        logs = db.query(ChatLog.log).filter(ChatLog.chat_id.in_(chat_ids)).all()
-        if not logs:
+        # chat_id에 해당하는 메시지 가져오기 (세션 로그 전체 대신 메시지 본문만 나눠 읽음)
+        messages = db.query(ChatMessage.message).filter(ChatMessage.chat_id.in_(chat_ids)).yield_per(1000)
+        logs_text = " ".join(message for (message,) in messages)  # 모든 메시지를 하나의 문자열로 결합
+        if not logs_text:
             raise HTTPException(status_code=404, detail="해당 User_idx에 대한 로그 데이터가 없습니다.")
 
-        logs_text = " ".join([log[0] for log in logs])  # 모든 로그를 하나의 문자열로 결합
-
         # 텍스트 전처리 (한국어 기준)
         words = preprocess_korean_text(logs_text)
 
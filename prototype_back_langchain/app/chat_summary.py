@@ -1,10 +1,62 @@
 import json
+import asyncio
+import logging
 from collections import deque
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, ChatSummary
+from persistence import PERSISTENCE_ENABLED
+
+# 채팅방별 대화 메모리: 최근 메시지는 원문으로, 밀려난 메시지는 누적 요약으로 유지한다.
+# 요약은 요청 처리와 별도로 백그라운드 작업에서 만들고 chat_summaries(kind=memory)에 저장해 재시작 후에도 이어 쓴다.
+
+SUMMARY_KIND_MEMORY = "memory"
+
+
+def load_memory_summary(room_id):
+    """
+    저장된 채팅방 메모리 요약을 읽는다. DB 오류 시나 DB 저장을 끈 경우 빈 요약으로 시작한다.
+    """
+    if not PERSISTENCE_ENABLED:
+        return ""
+    try:
+        with SessionLocal() as db:
+            row = db.query(ChatSummary.summary).filter(
+                ChatSummary.chat_id == room_id,
+                ChatSummary.kind == SUMMARY_KIND_MEMORY
+            ).first()
+        return row.summary if row else ""
+    except Exception as e:
+        logging.error(f"Error loading memory summary for room {room_id}: {e}")
+        return ""
+
+
+def save_memory_summary(room_id, summary, covered_until):
+    statement = insert(ChatSummary).values(
+        chat_id=room_id, kind=SUMMARY_KIND_MEMORY, summary=summary, covered_until=covered_until
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChatSummary.chat_id, ChatSummary.kind],
+        set_={"summary": summary, "covered_until": covered_until, "updated_at": datetime.now()}
+    )
+    with SessionLocal() as db:
+        db.execute(statement)
+        db.commit()
+
 
 class ChatSummaryMemory:
-    def __init__(self, max_history_length=5):
+    """
+    summarizer: async (기존 요약, 밀려난 메시지 목록) -> 새 요약
+    """
+    def __init__(self, room_id, summarizer, summary="", max_history_length=5):
+        self.room_id = room_id
+        self.summarizer = summarizer
+        self.summary = summary
         self.max_history_length = max_history_length
-        self.history = deque(maxlen=max_history_length)
+        self.history = deque()
+        self.pending = []  # 요약에 아직 반영되지 않은 밀려난 메시지
+        self._task = None
 
     def add_message(self, message, emotion, timestamp):
         self.history.append({
@@ -12,12 +64,48 @@ class ChatSummaryMemory:
             "emotion": emotion,
             "timestamp": timestamp
         })
+        while len(self.history) > self.max_history_length:
+            self.pending.append(self.history.popleft())
+        if self.pending and self._task is None:
+            self._task = asyncio.create_task(self._fold())
+
+    async def _fold(self):
+        """
+        밀려난 메시지를 요약에 합치고 저장한다. 실행 중에 더 밀려난 메시지는 이어서 처리한다.
+        요약에 실패했거나 빈 요약을 받은 메시지는 다음에 메시지가 밀려날 때 다시 시도한다.
+        """
+        try:
+            while self.pending:
+                messages, self.pending = self.pending, []
+                try:
+                    summary = await self.summarizer(self.summary, messages)
+                except Exception as e:
+                    logging.error(f"Error summarizing memory for room {self.room_id}: {e}")
+                    self.pending = messages + self.pending
+                    return
+                if not summary:
+                    logging.warning(f"Empty memory summary for room {self.room_id}; will retry {len(messages)} messages")
+                    self.pending = messages + self.pending
+                    return
+                self.summary = summary
+                if not PERSISTENCE_ENABLED:
+                    continue
+
+                try:
+                    covered_until = datetime.strptime(messages[-1]["timestamp"], "%Y-%m-%d %H:%M:%S")
+                    await run_in_threadpool(save_memory_summary, self.room_id, summary, covered_until)
+                except Exception as e:
+                    logging.error(f"Error saving memory summary for room {self.room_id}: {e}")
+        finally:
+            self._task = None
 
     def get_summary(self):
-        # 대화 이력을 요약하는 로직을 추가
-        # 예를 들어 최근 5개의 메시지만 요약하거나 특정 기준으로 필터링할 수 있음
-        return json.dumps(list(self.history), ensure_ascii=False, indent=4)
-    
+        # 누적 요약 + 최근 메시지 원문
+        return json.dumps({
+            "summary": self.summary,
+            "recent_messages": list(self.history)
+        }, ensure_ascii=False, indent=4)
+
     def get_recent_messages(self):
         # 최근 메시지들을 가져오는 메소드
         return list(self.history)
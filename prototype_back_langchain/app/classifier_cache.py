@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+import unicodedata
+import threading
+import logging
+import json
+import time
+import re
+import os
+
+# 감정 예측 결과 캐시
+# 인사, 'ㅋㅋㅋ', 이모지처럼 짧고 자주 반복되는 메시지는 정규화한 입력을 키로 LLM 결과를 재사용한다.
+# 짧은 메시지(CLASSIFIER_CACHE_MAX_LENGTH 이하)만 캐싱한다.
+# 호감도 분석은 대화 이력에 따라 결과가 달라지므로 캐싱하지 않는다 (메시지만으로 키를 만들면 다른 대화의 결과가 재사용됨).
+# CLASSIFIER_CACHE_PATH를 지정하면 서버 종료 시 파일로 저장하고 시작 시 다시 읽는다.
+
+load_dotenv()
+
+CLASSIFIER_CACHE_SIZE = int(os.getenv("CLASSIFIER_CACHE_SIZE", "4096"))
+CLASSIFIER_CACHE_TTL = float(os.getenv("CLASSIFIER_CACHE_TTL", "86400"))  # 초 단위
+CLASSIFIER_CACHE_MAX_LENGTH = int(os.getenv("CLASSIFIER_CACHE_MAX_LENGTH", "20"))  # 정규화 후 글자 수
+CLASSIFIER_CACHE_PATH = os.getenv("CLASSIFIER_CACHE_PATH")  # 없으면 메모리에만 보관
+
+REPEATED_CHARS = re.compile(r"(.)\1{2,}")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    캐시 키용 정규화: NFKC, 소문자, 공백 정리, 3번 이상 반복되는 글자는 3개로 ('ㅋㅋㅋㅋㅋ' -> 'ㅋㅋㅋ').
+    """
+    text = unicodedata.normalize("NFKC", message).lower().strip()
+    text = WHITESPACE.sub(" ", text)
+    return REPEATED_CHARS.sub(r"\1\1\1", text)
+
+
+class ClassifierCache:
+    """
+    (분류기 이름, 정규화된 메시지) -> 결과 LRU 캐시 (TTL 포함).
+    파일 저장을 위해 만료 시각은 time.time() 기준으로 보관한다.
+    """
+    def __init__(self, maxsize: int, ttl: float, max_length: int, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_length = max_length
+        self.path = path
+        self._data = OrderedDict()  # "분류기:메시지" -> (만료 시각, 결과)
+        self._lock = threading.Lock()
+        self.hits = {}  # 분류기별 적중 수
+        self.misses = {}  # 분류기별 미스 수
+
+    def key(self, classifier: str, message: str):
+        """
+        캐싱 대상이 아니면 None (너무 긴 메시지).
+        """
+        text = normalize_message(message)
+        if not text or len(text) > self.max_length:
+            return None
+        return f"{classifier}:{text}"
+
+    def get(self, classifier: str, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses[classifier] = self.misses.get(classifier, 0) + 1
+                return None
+            self._data.move_to_end(key)
+            self.hits[classifier] = self.hits.get(classifier, 0) + 1
+            return entry[1]
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+            now = time.time()
+            with self._lock:
+                for key, expires_at, value in entries[-self.maxsize:]:
+                    if expires_at > now:
+                        self._data[key] = (expires_at, value)
+            logging.info(f"Classifier cache loaded: {len(self._data)} entries")
+        except Exception as e:
+            logging.error(f"Error loading classifier cache: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[key, expires_at, value] for key, (expires_at, value) in self._data.items()]
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(entries, cache_file, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logging.error(f"Error saving classifier cache: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            classifiers = {}
+            for classifier in set(self.hits) | set(self.misses):
+                hits = self.hits.get(classifier, 0)
+                misses = self.misses.get(classifier, 0)
+                classifiers[classifier] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                }
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "classifiers": classifiers,
+            }
+
+
+classifier_cache = ClassifierCache(
+    CLASSIFIER_CACHE_SIZE, CLASSIFIER_CACHE_TTL, CLASSIFIER_CACHE_MAX_LENGTH, CLASSIFIER_CACHE_PATH
+)
+
+
+async def cached_classify(classifier: str, message: str, use_cache: bool, classify):
+    """
+    캐시에 있으면 반환하고, 없으면 classify()를 실행해 결과를 캐싱한다.
+    use_cache=False(채팅방에서 캐시를 끈 경우)면 항상 classify()를 실행한다.
+    """
+    key = classifier_cache.key(classifier, message) if use_cache else None
+    if key is None:
+        return await classify()
+
+    result = classifier_cache.get(classifier, key)
+    if result is None:
+        result = await classify()
+        classifier_cache.set(key, result)
+    return result
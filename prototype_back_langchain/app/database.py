@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, UniqueConstraint, Column, String, Text, DateTime, ForeignKey, Integer, Boolean, JSON, ARRAY, text
+from sqlalchemy import create_engine, UniqueConstraint, Column, String, Text, DateTime, ForeignKey, Integer, BigInteger, Boolean, JSON, text, Index
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -40,8 +41,20 @@ class Character(Base):
     char_description = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
     is_active = Column(Boolean, server_default=text("true"), nullable=False)
+    # 최신 프롬프트를 가리키는 포인터 (char_prompts와 순환 참조이므로 use_alter 사용)
+    current_prompt_id = Column(
+        Integer,
+        ForeignKey("char_prompts.char_prompt_id", use_alter=True, name="fk_characters_current_prompt"),
+        nullable=True
+    )
+    # 팔로워 수 카운터 (팔로우/언팔로우 시 함께 증감)
+    follower_count = Column(Integer, server_default=text("0"), nullable=False)
+    # 검색용 문서 (이름/설명/성격/태그를 정규화해서 합친 문자열, pg_trgm GIN 인덱스 대상)
+    search_text = Column(Text, nullable=True)
+    # 검색 문서의 1-gram/2-gram 목록 (한글 두 글자 검색어용 GIN 인덱스 대상)
+    search_grams = Column(ARRAY(Text), nullable=True)
     nicknames = Column(
-        JSON,
+        JSONB,
         nullable=False,
         default=lambda: {30: "stranger", 70: "friend", 100: "best friend"}
 )
@@ -91,6 +104,33 @@ class ChatLog(Base):
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
 
+# 채팅방별 대화 요약 (kind: history = 프롬프트 토큰 예산 밖으로 밀려난 오래된 대화의 누적 요약, memory = 캐릭터의 사용자 기억 요약)
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+
+    chat_id = Column(String(50), ForeignKey("chat_rooms.chat_id"), primary_key=True)
+    kind = Column(String(20), primary_key=True)
+    summary = Column(Text, nullable=False)
+    covered_until = Column(DateTime, nullable=True)  # 요약에 반영된 마지막 대화 시각
+    updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+
+# 채팅 메시지 (세션 종료 시 chat_logs와 함께 저장, 대화 기록 조회는 이 테이블에서 최근 N개만 읽는다)
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    message_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    chat_id = Column(String(50), ForeignKey("chat_rooms.chat_id"), nullable=False)
+    session_id = Column(String(50), nullable=False)
+    sender = Column(String(20), nullable=False)  # user / chatbot
+    message = Column(Text, nullable=False)
+    emotion = Column(String(20), nullable=True)  # 캐릭터 응답의 감정
+    favorability = Column(Integer, nullable=True)  # 캐릭터 응답 시점의 호감도
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_chat_messages_chat_id_created_at", "chat_id", "created_at"),
+    )
+
 # Images 테이블
 class Image(Base):
     __tablename__ = "images"
@@ -110,6 +150,10 @@ class ChatRoom(Base):
     favorability = Column(Integer, server_default=text("0"), nullable=False)
     user_unique_name = Column(String(50), nullable=True)
     user_introduction = Column(Text, nullable=True)
+    # 턴 처리 방식 (three_call / single_call, NULL이면 TURN_MODE 설정 사용)
+    turn_mode = Column(String(20), nullable=True)
+    # 감정 분류기 캐시 사용 여부
+    classifier_cache = Column(Boolean, server_default=text("true"), nullable=False)
     # 한 사용자가 같은 프롬프트 대상으로 채팅방 하나만 생성하게 유니크 제약조건 추가
     __table_args__ = (
         UniqueConstraint('user_idx', 'char_prompt_id', name='uq_user_char_prompt'), 
@@ -134,7 +178,7 @@ class CharacterPrompt(Base):
     character_personality = Column(Text, nullable=False)
     character_background = Column(Text, nullable=False)
     character_speech_style = Column(Text, nullable=False)
-    example_dialogues = Column(ARRAY(Text), nullable=True)
+    example_dialogues = Column(JSONB, nullable=True)  # 예시 대화 dict 리스트
 
 # GroupChats 테이블
 class GroupChat(Base):
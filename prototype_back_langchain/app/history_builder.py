@@ -0,0 +1,197 @@
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from langchain.prompts import PromptTemplate
+from langchain.chains import LLMChain
+from database import SessionLocal, ChatMessage, ChatSummary
+from persistence import PERSISTENCE_ENABLED
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+import tiktoken
+import asyncio
+import logging
+import re
+import os
+
+import openai_api
+
+# 토큰 예산 안에서 프롬프트용 대화 기록을 만든다.
+# 최근 대화는 원문 그대로, 예산 밖으로 밀려난 오래된 대화는 채팅방별 누적 요약(chat_summaries, kind=history)으로 넣는다.
+# 최근 대화가 예산을 넘으면 절반만 남기고 나머지를 요약에 합치므로 요약 호출은 몇 턴에 한 번만 일어나며,
+# 요약은 응답 생성을 기다리게 하지 않도록 백그라운드에서 실행한다.
+
+load_dotenv()
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_SUMMARY_RATIO = 0.25  # 예산 중 요약에 쓰는 비율, 나머지는 최근 대화
+HISTORY_MESSAGE_LIMIT = 200  # 요약되지 않은 이전 세션 메시지를 최대 몇 개까지 읽을지
+
+SUMMARY_KIND_HISTORY = "history"
+
+LOG_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (user|chatbot): ")
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+try:
+    encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+except KeyError:
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+HISTORY_SUMMARY_TEMPLATE = """
+        You maintain a running summary of a conversation between a user and a fictional character.
+
+        Current summary (may be empty):
+        {summary}
+
+        New conversation lines to fold into the summary:
+        {conversation}
+
+        Rewrite the summary so it covers both. Keep names, facts the user shared, promises, and how the relationship developed.
+        Write it in the same language as the conversation, in at most {max_tokens} tokens. Provide only the summary.
+        """
+
+history_summary_prompt = PromptTemplate(
+    template=HISTORY_SUMMARY_TEMPLATE,
+    input_variables=["summary", "conversation", "max_tokens"]
+)
+
+# 채팅방별 진행 중인 요약 작업 (같은 채팅방에 중복 실행하지 않음)
+folding_tasks: Dict[str, asyncio.Task] = {}
+
+
+def count_tokens(text: str) -> int:
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def parse_log(log: str, after: Optional[datetime]) -> List[Tuple[datetime, str]]:
+    """
+    세션 로그에서 user/chatbot 대화를 (시각, 원문) 목록으로 읽는다. 여러 줄 메시지는 한 항목으로 합친다.
+    after가 있으면 그 시각 이후의 대화만 반환한다 (이미 요약에 반영된 대화 제외).
+    """
+    entries = []
+    for line in log.splitlines():
+        match = LOG_LINE.match(line)
+        if match:
+            entries.append((datetime.strptime(match.group(1), LOG_TIME_FORMAT), line))
+        elif entries and line and not line.startswith("Session "):
+            timestamp, previous = entries[-1]
+            entries[-1] = (timestamp, f"{previous}\n{line}")
+    if after is not None:
+        entries = [entry for entry in entries if entry[0] > after]
+    return entries
+
+
+def load_history_source(room_id: str) -> Tuple[str, Optional[datetime], List[Tuple[datetime, str]]]:
+    """
+    채팅방의 누적 요약과, 요약 이후 이전 세션 메시지 최근 HISTORY_MESSAGE_LIMIT개(오래된 순)를 DB에서 읽는다.
+    메시지는 (chat_id, created_at) 인덱스로 최신순 LIMIT 조회한다.
+    """
+    with SessionLocal() as db:
+        row = db.query(ChatSummary).filter(
+            ChatSummary.chat_id == room_id,
+            ChatSummary.kind == SUMMARY_KIND_HISTORY
+        ).first()
+        summary, covered_until = (row.summary, row.covered_until) if row else ("", None)
+
+        query = db.query(ChatMessage.created_at, ChatMessage.sender, ChatMessage.message).filter(
+            ChatMessage.chat_id == room_id
+        )
+        if covered_until is not None:
+            query = query.filter(ChatMessage.created_at > covered_until)
+        messages = query.order_by(ChatMessage.created_at.desc(), ChatMessage.message_id.desc()).limit(HISTORY_MESSAGE_LIMIT).all()
+    return summary, covered_until, [
+        (created_at, f"[{created_at.strftime(LOG_TIME_FORMAT)}] {sender}: {message}")
+        for created_at, sender, message in reversed(messages)
+    ]
+
+
+def save_history_summary(room_id: str, summary: str, covered_until: datetime):
+    """
+    누적 요약 저장. 이미 더 최근까지 반영된 요약이 있으면 덮어쓰지 않는다.
+    """
+    statement = insert(ChatSummary).values(
+        chat_id=room_id, kind=SUMMARY_KIND_HISTORY, summary=summary, covered_until=covered_until
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChatSummary.chat_id, ChatSummary.kind],
+        set_={"summary": summary, "covered_until": covered_until, "updated_at": datetime.now()},
+        where=(ChatSummary.covered_until == None) | (ChatSummary.covered_until < covered_until)
+    )
+    with SessionLocal() as db:
+        db.execute(statement)
+        db.commit()
+
+
+async def fold_history(room_id: str, summary: str, entries: List[Tuple[datetime, str]], max_tokens: int):
+    """
+    밀려난 대화를 기존 요약에 합쳐 새 요약을 저장한다.
+    """
+    try:
+        chain = LLMChain(llm=openai_api.llm, prompt=history_summary_prompt)
+        response = await chain.ainvoke({
+            "summary": summary,
+            "conversation": "\n".join(line for _, line in entries),
+            "max_tokens": max_tokens
+        })
+        new_summary = truncate_tokens(response.get("text", "").strip(), max_tokens)
+        if not new_summary:
+            return
+        await run_in_threadpool(save_history_summary, room_id, new_summary, entries[-1][0])
+        logging.info(f"History summary updated for room {room_id}: {len(entries)} lines folded")
+    except Exception as e:
+        logging.error(f"Error folding chat history for room {room_id}: {e}")
+
+
+def schedule_fold(room_id: str, summary: str, entries: List[Tuple[datetime, str]], max_tokens: int):
+    if room_id in folding_tasks:
+        return
+    task = asyncio.create_task(fold_history(room_id, summary, entries, max_tokens))
+    folding_tasks[room_id] = task
+    task.add_done_callback(lambda _: folding_tasks.pop(room_id, None))
+
+
+def fold_point(entries: List[Tuple[datetime, str]], tokens: List[int], keep_budget: int) -> int:
+    """
+    최근 대화 중 keep_budget 토큰 안에 드는 것만 남길 때, 요약으로 넘길 항목 수.
+    같은 초에 기록된 대화는 covered_until 경계가 갈리지 않도록 함께 넘긴다.
+    """
+    kept = 0
+    cut = len(entries)
+    while cut > 0 and kept + tokens[cut - 1] <= keep_budget:
+        kept += tokens[cut - 1]
+        cut -= 1
+    while 0 < cut < len(entries) and entries[cut][0] == entries[cut - 1][0]:
+        cut += 1
+    return cut
+
+
+async def build_chat_history(room_id: str, current_session_logs: str, budget: int = HISTORY_TOKEN_BUDGET) -> str:
+    """
+    누적 요약 + 예산 안에 드는 최근 대화 원문으로 프롬프트용 대화 기록을 만든다.
+    최근 대화가 예산을 넘으면 이번 턴은 예산에 맞게 자르고, 오래된 절반은 백그라운드에서 요약에 합친다.
+    DB 저장을 끈 경우(CHAT_PERSISTENCE=off) 현재 세션 대화만 사용하고 요약은 만들지 않는다.
+    """
+    summary_budget = int(budget * HISTORY_SUMMARY_RATIO)
+    recent_budget = budget - summary_budget
+
+    if PERSISTENCE_ENABLED:
+        summary, covered_until, entries = await run_in_threadpool(load_history_source, room_id)
+    else:
+        summary, covered_until, entries = "", None, []
+    entries += parse_log(current_session_logs, covered_until)
+
+    tokens = [count_tokens(line) for _, line in entries]
+    if sum(tokens) > recent_budget:
+        cut = fold_point(entries, tokens, recent_budget // 2)
+        if cut > 0 and PERSISTENCE_ENABLED:
+            schedule_fold(room_id, summary, entries[:cut], summary_budget)
+        entries = entries[fold_point(entries, tokens, recent_budget):]
+
+    recent = "\n".join(line for _, line in entries)
+    if not summary:
+        return recent
+    return f"Summary of earlier conversation:\n{summary}\n\nRecent conversation:\n{recent}"
@@ -0,0 +1,87 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+import asyncio
+import heapq
+import time
+import os
+
+# 세션 비활성 시간 초과 스케줄러
+# 세션마다 타이머 작업을 두는 대신 프로세스 전체에서 백그라운드 작업 하나가 만료 힙을 확인한다.
+# 활동 시에는 마지막 활동 시각만 갱신하고(O(1)), 힙 항목은 만료 시점에 실제 마지막 활동 시각으로 다시 확인해
+# 그 사이 활동이 있었으면 새 만료 시각으로 다시 넣는다.
+
+load_dotenv()
+
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "600"))  # 초 단위 (기본 10분)
+INACTIVITY_CHECK_INTERVAL = 1.0  # 만료 확인 주기 (초)
+
+
+class InactivityScheduler:
+    def __init__(self, on_expire: Callable[[str], Awaitable[None]], timeout: float = SESSION_IDLE_TIMEOUT):
+        self.on_expire = on_expire
+        self.timeout = timeout
+        self.last_activity: Dict[str, float] = {}  # 세션 ID -> 마지막 활동 시각
+        self._heap = []  # (만료 예정 시각, 세션 ID)
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, session_id: str):
+        now = time.monotonic()
+        self.last_activity[session_id] = now
+        heapq.heappush(self._heap, (now + self.timeout, session_id))
+
+    def touch(self, session_id: str):
+        if session_id in self.last_activity:
+            self.last_activity[session_id] = time.monotonic()
+
+    def remove(self, session_id: str):
+        # 힙 항목은 만료 확인 시 건너뛴다
+        self.last_activity.pop(session_id, None)
+
+    def pop_expired(self, now: float) -> List[str]:
+        """
+        만료된 세션 ID 목록. 그 사이 활동이 있었던 세션은 새 만료 시각으로 다시 넣는다.
+        """
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, session_id = heapq.heappop(self._heap)
+            last_activity = self.last_activity.get(session_id)
+            if last_activity is None:
+                continue
+            deadline = last_activity + self.timeout
+            if deadline <= now:
+                del self.last_activity[session_id]
+                expired.append(session_id)
+            else:
+                heapq.heappush(self._heap, (deadline, session_id))
+        return expired
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(INACTIVITY_CHECK_INTERVAL)
+            expired = self.pop_expired(time.monotonic())
+            if not expired:
+                continue
+            results = await asyncio.gather(*(self.on_expire(session_id) for session_id in expired), return_exceptions=True)
+            for session_id, result in zip(expired, results):
+                if isinstance(result, Exception):
+                    print(f"Error expiring session {session_id}: {str(result)}")
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tracked_sessions": len(self.last_activity),
+            "heap_size": len(self._heap),
+            "idle_timeout": self.timeout,
+        }
@@ -0,0 +1,123 @@
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+from dotenv import load_dotenv
+import asyncio
+import random
+import math
+import json
+import time
+import zlib
+import os
+
+# LLM 백엔드 선택 (LLM_BACKEND)
+# openai: gpt-4o-mini (기본값)
+# stub: OpenAI를 호출하지 않고 지정한 지연 시간 분포에 따라 기다렸다 결정적인 응답을 돌려주는 로컬 스텁 (부하 테스트용)
+
+load_dotenv()
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+OPENAI_MODEL = "gpt-4o-mini"
+
+# 스텁 설정
+STUB_LLM_LATENCY = float(os.getenv("STUB_LLM_LATENCY", "0.5"))  # 호출 1회 평균 지연 시간 (초)
+STUB_LLM_DISTRIBUTION = os.getenv("STUB_LLM_DISTRIBUTION", "fixed")  # fixed / uniform / exponential / lognormal
+STUB_LLM_SIGMA = float(os.getenv("STUB_LLM_SIGMA", "0.5"))  # lognormal 분포의 표준편차
+STUB_LLM_TOKEN_DELAY = float(os.getenv("STUB_LLM_TOKEN_DELAY", "0.02"))  # 스트리밍 시 조각 사이 지연 (초)
+STUB_LLM_SEED = int(os.getenv("STUB_LLM_SEED", "0"))
+
+STUB_EMOTIONS = ["Happy", "Sad", "Angry", "Confused", "Grateful", "Embarrassed", "Nervous"]
+STUB_OUTCOMES = ["Increase", "Decrease", "Neutral"]
+
+stub_random = random.Random(STUB_LLM_SEED)
+
+
+def sample_latency(latency: float, distribution: str, sigma: float = STUB_LLM_SIGMA) -> float:
+    """
+    평균이 latency인 지연 시간을 분포에 따라 뽑는다. 같은 시드면 같은 순서로 나온다.
+    """
+    if latency <= 0:
+        return 0.0
+    if distribution == "uniform":
+        return stub_random.uniform(latency * 0.5, latency * 1.5)
+    if distribution == "exponential":
+        return stub_random.expovariate(1 / latency)
+    if distribution == "lognormal":
+        return stub_random.lognormvariate(math.log(latency) - sigma ** 2 / 2, sigma)
+    return latency
+
+
+def stub_response(prompt: str) -> str:
+    """
+    프롬프트 종류에 맞는 응답. 같은 프롬프트에는 항상 같은 응답을 돌려준다.
+    """
+    seed = zlib.crc32(prompt.encode("utf-8"))
+    if "Provide only the predicted emotion" in prompt:
+        return STUB_EMOTIONS[seed % len(STUB_EMOTIONS)]
+    if "Increase, Decrease, or Neutral" in prompt:
+        return STUB_OUTCOMES[seed % len(STUB_OUTCOMES)]
+    if "Respond with only a JSON object" in prompt:
+        return json.dumps({
+            "reply": f"스텁 응답입니다. ({seed % 1000})",
+            "emotion": STUB_EMOTIONS[seed % len(STUB_EMOTIONS)],
+            "favorability_outcome": STUB_OUTCOMES[seed % len(STUB_OUTCOMES)]
+        }, ensure_ascii=False)
+    if "Provide only the summary" in prompt or "Provide only the updated memory" in prompt:
+        return f"스텁 요약입니다. ({seed % 1000})"
+    return f"스텁 캐릭터 응답입니다. 오늘은 날씨가 좋네요. 무엇을 하고 싶나요? ({seed % 1000})"
+
+
+class StubChatModel(BaseChatModel):
+    """
+    지연 시간 분포에 따라 기다린 뒤 stub_response를 반환하는 LLM.
+    스트리밍 시 응답을 단어 단위로 token_delay 간격을 두고 나눠 보낸다.
+    """
+    latency: float = STUB_LLM_LATENCY
+    distribution: str = STUB_LLM_DISTRIBUTION
+    token_delay: float = STUB_LLM_TOKEN_DELAY
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _prompt(self, messages) -> str:
+        return "\n".join(str(message.content) for message in messages)
+
+    def _result(self, messages) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=stub_response(self._prompt(messages))))])
+
+    def _pieces(self, messages):
+        words = stub_response(self._prompt(messages)).split(" ")
+        return [word if index == len(words) - 1 else f"{word} " for index, word in enumerate(words)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(sample_latency(self.latency, self.distribution))
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(sample_latency(self.latency, self.distribution))
+        return self._result(messages)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(sample_latency(self.latency, self.distribution))
+        for piece in self._pieces(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            time.sleep(self.token_delay)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(sample_latency(self.latency, self.distribution))
+        for piece in self._pieces(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            await asyncio.sleep(self.token_delay)
+
+
+def create_llm(api_key=None):
+    """
+    LLM_BACKEND 설정에 맞는 LLM 인스턴스를 만든다.
+    """
+    if LLM_BACKEND == "stub":
+        return StubChatModel()
+    if LLM_BACKEND != "openai":
+        raise ValueError(f"알 수 없는 LLM_BACKEND: {LLM_BACKEND}")
+    return ChatOpenAI(model=OPENAI_MODEL, openai_api_key=api_key)
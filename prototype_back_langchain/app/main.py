@@ -1,18 +1,42 @@
 from starlette.websockets import WebSocketState  # Starlette에서 WebSocket 상태 상수 가져오기
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from database import SessionLocal, ChatLog # DB 세션 가져오기
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Optional, Any
+from contextlib import asynccontextmanager
 from datetime import datetime
 import asyncio
-import uuid
 import os
 
-from openai_api import get_openai_response  # OpenAI API 호출 모듈
+from openai_api import get_openai_response, stream_openai_response  # OpenAI API 호출 모듈
+from persona_cache import Persona, get_persona
+from history_builder import build_chat_history
+from classifier_cache import classifier_cache
+from transcript import TranscriptBuffer, LogWriter
+from session_registry import SessionRegistry
+from inactivity import InactivityScheduler
+from persistence import SessionPersister, PERSISTENCE_ENABLED
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작/종료 시 실행할 작업. 종료 시에는 저장 큐를 비운 뒤 로그 파일 기록을 마친다.
+    """
+    classifier_cache.load()
+    await chat.log_writer.start()
+    await chat.inactivity.start()
+    await chat.persister.start()
+    try:
+        yield
+    finally:
+        classifier_cache.save()
+        await chat.inactivity.close()
+        await chat.persister.close()
+        await chat.log_writer.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 CLIENT_DOMAIN = os.getenv("CLIENT_DOMAIN")
 
@@ -26,38 +50,38 @@ app.add_middleware(
 )
 
 
-# DB 세션 관리
-def get_db():
+class GenerateRequest(BaseModel):
     """
-    데이터베이스 세션을 생성하고 반환.
+    턴 요청. 메인 백엔드는 메시지, 호감도, 페르소나 버전만 보내고 페르소나는 서버 캐시에서 가져온다.
+    페르소나 필드를 모두 함께 보내면(이전 형식) 그 값을 그대로 사용한다.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-class GenerateRequest(BaseModel):
     user_message: str
-    character_name: str
-    nickname: dict
-    user_unique_name: Optional[str]
-    user_introduction: Optional[str]
     favorability: int
-    character_appearance: str
-    character_personality: str
-    character_background: str
-    character_speech_style: str
-    example_dialogues: List[Any]
-    chat_history: Optional[str] = None
+    persona_version: Optional[str] = None
+    character_name: Optional[str] = None
+    nickname: Optional[dict] = None
+    user_unique_name: Optional[str] = None
+    user_introduction: Optional[str] = None
+    character_appearance: Optional[str] = None
+    character_personality: Optional[str] = None
+    character_background: Optional[str] = None
+    character_speech_style: Optional[str] = None
+    example_dialogues: Optional[List[Any]] = None
+    chat_history: Optional[str] = None  # 보내면 서버에서 대화 기록을 만들지 않고 그대로 사용 (부하 테스트 등)
+    turn_mode: Optional[str] = None  # three_call / single_call (없으면 채팅방 설정, 서버 TURN_MODE 순)
+    classifier_cache: Optional[bool] = None  # 분류기 캐시 사용 여부 (없으면 채팅방 설정)
 
 # 웹소켓 연결 관리
 class Chat:
     def __init__(self):
-        self.active_connections: Dict[str, Tuple[WebSocket, str]] = {}  # 세션 ID와 웹소켓 연결 및 채팅룸 id 매핑
-        self.inactive_tasks: Dict[str, asyncio.Task] = {}  # 세션별 비활성화 타이머 관리
+        self.registry = SessionRegistry()  # 세션 ID / 채팅룸 id로 세션과 연결된 웹소켓 조회
+        self.inactivity = InactivityScheduler(self.expire_session)  # 전체 세션 비활성 시간 초과 관리
+        self.room_locks: Dict[str, asyncio.Lock] = {}  # 채팅룸별 요청 순서 보장
+        self.room_lock_users: Dict[str, int] = {}  # 채팅룸 락을 잡고 있거나 기다리는 요청 수
+        self.transcripts: Dict[str, TranscriptBuffer] = {}  # 세션별 대화 내용 (대화 기록 조회용)
         self.logs_path = "chat_logs"  # 로그 파일 디렉토리
+        self.log_writer = LogWriter(self.logs_path)  # 로그 파일 백그라운드 기록
+        self.persister = SessionPersister(self.log_writer)  # 종료된 세션 DB 저장 (백그라운드)
 
         # chat_log 디렉토리가 없을 경우 새로 생성
         if not os.path.exists(self.logs_path):
@@ -65,107 +89,104 @@ class Chat:
 
     # 연결설정: 클라이언트 연결 수락하고 세션 id 생성
     async def connect(self, websocket: WebSocket, room_id: str):
-        # 기존 세션 ID 확인
-        for session_id, (existing_websocket, existing_room_id) in self.active_connections.items():
-            if existing_room_id == room_id:
-                # 동일한 room_id에 대한 연결이 이미 있으면 해당 세션 ID 반환
-                print(f"Reusing existing session ID: {session_id}")
-                await websocket.accept()  # 새 연결도 수락
-                self.active_connections[session_id] = (websocket, room_id)  # WebSocket을 업데이트
-                return session_id
-
-        # 새로운 세션 생성
         await websocket.accept()
-        session_id = str(uuid.uuid4())
-        self.active_connections[session_id] = (websocket, room_id)
 
-         # 세션 로그 파일 생성
-        log_path = f"{self.logs_path}/{session_id}.log"
-        with open(log_path, "a", encoding="utf-8") as log_file:
-            start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_file.write(f"Session opened at: {start_time}\n")
+        # 동일한 room_id의 세션이 이미 있으면 새 웹소켓도 같은 세션에 추가 (여러 탭/기기)
+        session = self.registry.for_room(room_id)
+        if session is not None:
+            print(f"Reusing existing session ID: {session.session_id}")
+        else:
+            # 새로운 세션 생성
+            session = self.registry.get(self.open_session(room_id))
+        self.registry.attach(session, websocket)
+        self.inactivity.touch(session.session_id)
+        return session.session_id
+
+    def open_session(self, room_id: str) -> str:
+        """
+        세션 ID를 만들고 로그 파일과 비활성화 타이머를 시작합니다.
+        멀티플렉스 연결의 채팅룸 세션은 웹소켓 없이 생성됩니다.
+        """
+        session_id = self.registry.create(room_id).session_id
+        self.transcripts[session_id] = TranscriptBuffer()
+
+        # 세션 로그 파일 생성
+        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.log_writer.append(session_id, f"Session opened at: {start_time}\n")
 
         # 비활성화 타이머 시작 (10분)
-        self.inactive_tasks[session_id] = asyncio.create_task(self.inactivity_check(session_id))
+        self.inactivity.register(session_id)
         return session_id
 
+    def room_session(self, room_id: str) -> str:
+        """
+        멀티플렉스 연결에서 채팅룸의 현재 세션 ID를 반환 (없으면 새로 생성).
+        """
+        session = self.registry.for_room(room_id)
+        return session.session_id if session is not None else self.open_session(room_id)
+
+    @asynccontextmanager
+    async def room_lock(self, room_id: str):
+        """
+        채팅룸 요청을 순서대로 처리하는 락. 잡고 있거나 기다리는 요청이 없어질 때만 락을 지운다.
+        """
+        lock = self.room_locks.get(room_id)
+        if lock is None:
+            lock = self.room_locks[room_id] = asyncio.Lock()
+        self.room_lock_users[room_id] = self.room_lock_users.get(room_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self.room_lock_users[room_id] -= 1
+            if self.room_lock_users[room_id] == 0:
+                del self.room_lock_users[room_id]
+                del self.room_locks[room_id]
+
+    def release(self, session_id: str, websocket: WebSocket):
+        """
+        웹소켓 연결 종료 시 호출. 세션에 남은 웹소켓이 없으면 세션을 종료합니다.
+        """
+        if self.registry.detach(session_id, websocket) == 0:
+            self.disconnect(session_id)
+
     # 연결 해제 - 로그 파일을 DB에 저장하고 실행중인 타이머가 있다면 취소
     def disconnect(self, session_id: str):
-        if session_id not in self.active_connections:
+        session = self.registry.remove(session_id)
+        if session is None:
             print(f"Session {session_id} already disconnected.")
             return
-        
-        websocket, room_id = self.active_connections.pop(session_id, (None, None))
-        # print(f"Disconnected session. room_id: {room_id}, websocket: {websocket}")
-        log_path = f"{self.logs_path}/{session_id}.log"
 
-        if websocket:
+        room_id = session.room_id
+        transcript = self.transcripts.pop(session_id, None)
+
+        if room_id:
             end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            # 로그 파일이 존재하고 실제 대화 내용이 있는지 확인
-            if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8") as log_file:
-                    log_lines = log_file.readlines()
-                    has_content = any("user:" in line or "chatbot:" in line for line in log_lines)
-
-                # 대화 내용이 없는 경우 로그 파일 삭제
-                if not has_content:
-                    os.remove(log_path)
-                else:
-                    # 대화 내용이 있는 경우에만 종료 시간 기록 후 DB에 저장
-                    with open(log_path, "a", encoding="utf-8") as log_file:
-                        log_file.write(f"Session closed at: {end_time}\n")
-
-                    # 로그 DB 저장
-                    try:
-                        with SessionLocal() as db:  # 데이터베이스 세션 생성
-                            self.save_log_to_db(session_id, room_id, end_time, db)
-                            os.remove(log_path)
-                    except Exception as e:
-                        print(f"Error saving log to database: {e}")
-
-        # 비활성화 타이머가 있는 경우 취소
-        if session_id in self.inactive_tasks:
-            self.inactive_tasks[session_id].cancel()
-            del self.inactive_tasks[session_id]
-
-    async def log_message(self, session_id: str, sender: str, message: str):
-        log_path = f"{self.logs_path}/{session_id}.log"
-        with open(log_path, "a", encoding="utf-8") as log_file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_file.write(f"[{timestamp}] {sender}: {message}\n")
-            log_file.flush()
+            # 대화 내용이 없거나 DB 저장을 끈 경우(CHAT_PERSISTENCE=off) 로그 파일 삭제
+            if transcript is None or not transcript.has_content or not PERSISTENCE_ENABLED:
+                self.log_writer.discard(session_id)
+            else:
+                # 대화 내용이 있는 경우에만 종료 시간 기록 후 DB 저장 큐에 추가
+                self.log_writer.append(session_id, f"Session closed at: {end_time}\n")
+                self.persister.enqueue(session_id, room_id, end_time)
+
+        # 비활성 시간 초과 대상에서 제외
+        self.inactivity.remove(session_id)
+
+    async def log_message(self, session_id: str, sender: str, message: str, emotion: Optional[str] = None, favorability: Optional[int] = None):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.inactivity.touch(session_id)
+        transcript = self.transcripts.get(session_id)
+        if transcript is not None:
+            turn = transcript.append(timestamp, sender, message, emotion, favorability)
+            self.log_writer.append_message(session_id, turn)
+        self.log_writer.append(session_id, f"[{timestamp}] {sender}: {message}\n")
 
     def get_current_session_logs(self, session_id: str) -> str:
-        """현재 세션의 대화 내용을 가져옵니다."""
-        log_path = f"{self.logs_path}/{session_id}.log"
-        if os.path.exists(log_path):
-            with open(log_path, "r", encoding="utf-8") as log_file:
-                logs = log_file.readlines()
-                # 실제 대화 내용만 반환 (Session opened/closed 등은 제외)
-                chat_logs = [line for line in logs if 'user:' in line or 'chatbot:' in line]
-                return ''.join(chat_logs)
-        return ""
-
-    def get_all_chat_history(self, session_id: str, room_id: str, db: Session) -> str:
-        """DB에 저장된 이전 대화와 현재 세션의 대화를 모두 가져옵니다."""
-        # DB에서 이전 대화 기록 가져오기
-        logs = db.query(ChatLog).filter(
-            ChatLog.chat_id == room_id
-        ).order_by(ChatLog.end_time.desc()).limit(10).all()
-        
-        chat_history = ""
-        # DB 저장된 이전 대화 기록
-        for log in logs:
-            for line in log.log.split('\n'):
-                if 'user:' in line or 'chatbot:' in line:
-                    chat_history += line + '\n'
-        
-        # 현재 세션의 대화 기록 추가
-        current_session_logs = self.get_current_session_logs(session_id)
-        chat_history += current_session_logs
-        
-        return chat_history
+        """현재 세션의 대화 내용을 가져옵니다 (메모리 버퍼, 파일을 읽지 않음)."""
+        transcript = self.transcripts.get(session_id)
+        return transcript.render() if transcript is not None else ""
 
     async def send_message(self, websocket: WebSocket, session_id: str, message: dict):
         """
@@ -179,62 +200,113 @@ class Chat:
 
             # 응답 로그 기록
             if "text" in message:
-                await self.log_message(session_id, "chatbot", message["text"])
+                await self.log_message(session_id, "chatbot", message["text"], message.get("emotion"), message.get("favorability"))
         except WebSocketDisconnect:
             print(f"WebSocket disconnected for session while sending message {session_id}.")
         except Exception as e:
             print(f"Error sending message for session {session_id}: {str(e)}")
 
-    # 자리비움 타이머 설정 및 일정 시간 초과시 세션 연결 해제
-    async def inactivity_check(self, session_id: str):
-        try:
-            while True:
-                await asyncio.sleep(600)  # 10분(600초) 대기
-                websocket, _ = self.active_connections.get(session_id, (None, None))
-                if websocket and websocket.application_state == WebSocketState.CONNECTED:
+    # 자리비움 시간 초과 시 (InactivityScheduler에서 호출) 세션 연결 해제
+    async def expire_session(self, session_id: str):
+        session = self.registry.get(session_id)
+        minutes = int(self.inactivity.timeout // 60)
+        for websocket in list(session.websockets) if session else []:
+            try:
+                if websocket.application_state == WebSocketState.CONNECTED:
                     await websocket.send_json({
                         "sender": "bot",
-                        "message": "10분 동안 활동이 없어 연결이 종료됩니다."
+                        "message": f"{minutes}분 동안 활동이 없어 연결이 종료됩니다."
                     })
                     await websocket.close()
-                self.disconnect(session_id)
-        except asyncio.CancelledError:
-            # 타이머가 취소된 경우 무시
-            pass
-        except Exception as e:
-            print(f"Error in inactivity_check for session {session_id}: {str(e)}")
+            except Exception as e:
+                print(f"Error closing idle WebSocket for session {session_id}: {str(e)}")
+        self.disconnect(session_id)
 
-    # 데이터베이스에 로그 저장
-    def save_log_to_db(self, session_id: str, room_id: str, end_time: str, db: Session = Depends(get_db)):
-        log_path = f"{self.logs_path}/{session_id}.log"
-        with open(log_path, "r", encoding="utf-8") as log_file:
-            log_content = log_file.read()
 
-        # 로그파일에서 세션시작시간 추출
-        try:
-            start_time = next(
-                line.split(": ")[-1] for line in log_content.splitlines()
-                if "Session opened at:" in line
-            )
-            start_time = datetime.strptime(start_time.strip(), "%Y-%m-%d %H:%M:%S")  # 문자열 -> datetime 변환
-        except StopIteration:
-            raise ValueError("로그 파일에 'Session opened at:'이 없습니다.")
-        
-        # ChatLog ORM 인스턴스 생성
-        chat_log = ChatLog(
-            session_id=session_id,
-            chat_id=room_id,
-            start_time=start_time,
-            end_time=end_time,
-            log=log_content
-        )
-
-        # 데이터베이스에 저장
-        db.add(chat_log)
-        db.commit()
+chat = Chat()
 
 
-chat = Chat()
+async def resolve_persona(room_id: str, request: GenerateRequest) -> Persona:
+    """
+    요청에 페르소나가 포함되어 있으면 사용하고, 아니면 채팅방 페르소나 캐시에서 가져옵니다.
+    요청의 classifier_cache는 openai_arguments에서 채팅방 설정보다 우선 적용하므로 여기서는 제외합니다.
+    """
+    if request.character_name is not None:
+        return Persona(**request.dict(include=set(Persona.__fields__) - {"classifier_cache"}))
+    return await get_persona(room_id, request.persona_version)
+
+
+def openai_arguments(request: GenerateRequest, persona: Persona, chat_history: str, room_id: str) -> dict:
+    return dict(
+        user_message=request.user_message,
+        character_name=persona.character_name,
+        nickname=persona.nickname,
+        user_unique_name=persona.user_unique_name,
+        user_introduction=persona.user_introduction,
+        favorability=request.favorability,
+        appearance=persona.character_appearance,
+        personality=persona.character_personality,
+        background=persona.character_background,
+        speech_style=persona.character_speech_style,
+        example_dialogues=persona.example_dialogues,
+        chat_history=chat_history,
+        room_id=room_id,
+        turn_mode=request.turn_mode or persona.turn_mode,
+        classifier_cache=persona.classifier_cache if request.classifier_cache is None else request.classifier_cache
+    )
+
+
+async def prepare_turn(session_id: str, room_id: str, request: GenerateRequest) -> dict:
+    """
+    페르소나와 대화 기록을 모으고 사용자 메시지를 세션 로그에 기록합니다.
+    반환값: get_openai_response / stream_openai_response 인자
+    """
+    persona = await resolve_persona(room_id, request)
+
+    chat_history = request.chat_history
+    if chat_history is None:
+        chat_history = await build_chat_history(room_id, chat.get_current_session_logs(session_id))
+
+    await chat.log_message(session_id, "user", request.user_message)
+    return openai_arguments(request, persona, chat_history, room_id)
+
+
+def reply_frame(bot_response: dict, request: GenerateRequest) -> dict:
+    return {
+        "text": bot_response.get("response", ""),
+        "emotion": bot_response.get("emotion", "Neutral"),
+        "favorability": bot_response.get("favorability", request.favorability)
+    }
+
+
+async def generate_reply(session_id: str, room_id: str, request: GenerateRequest) -> dict:
+    """
+    캐릭터 응답 전체를 생성해서 반환합니다.
+    """
+    arguments = await prepare_turn(session_id, room_id, request)
+
+    # OpenAI API를 통해 캐릭터 응답 생성
+    bot_response = await get_openai_response(**arguments)
+
+    print("OpenAI response:", bot_response)  # 디버깅용 로그
+
+    return reply_frame(bot_response, request)
+
+
+async def stream_reply(session_id: str, room_id: str, request: GenerateRequest):
+    """
+    캐릭터 응답을 {"type": "delta", "delta": ...} 프레임으로 스트리밍하고,
+    마지막에 감정/호감도가 담긴 {"type": "final", ...} 프레임을 보냅니다.
+    """
+    arguments = await prepare_turn(session_id, room_id, request)
+
+    async for item in stream_openai_response(**arguments):
+        if "delta" in item:
+            yield {"type": "delta", "delta": item["delta"]}
+        elif "error" in item:
+            yield {"type": "final", "error": item["error"]}
+        else:
+            yield {"type": "final", **reply_frame(item, request)}
 
 
 @app.websocket("/ws/generate/")
@@ -250,11 +322,6 @@ async def websocket_generate(websocket: WebSocket, room_id: str):
                 data = await websocket.receive_json()
                 request = GenerateRequest(**data)
 
-                with SessionLocal() as db:
-                    chat_history = chat.get_all_chat_history(session_id, room_id, db)
-
-                await chat.log_message(session_id, "user", request.user_message)
-
             except ValueError as e:
                 print(f"Invalid JSON format: {e}")
                 await websocket.close(code=1003, reason="Invalid JSON format")
@@ -268,31 +335,9 @@ async def websocket_generate(websocket: WebSocket, room_id: str):
                 continue
 
             try:
-                # OpenAI API를 통해 캐릭터 응답 생성
-                bot_response = get_openai_response(
-                    user_message=request.user_message,
-                    character_name=request.character_name,
-                    nickname=request.nickname,
-                    user_unique_name=request.user_unique_name,
-                    user_introduction=request.user_introduction,
-                    favorability=request.favorability,
-                    appearance=request.character_appearance,
-                    personality=request.character_personality,
-                    background=request.character_background,
-                    speech_style=request.character_speech_style,
-                    example_dialogues=request.example_dialogues,
-                    chat_history=chat_history,
-                    room_id=room_id
-                )
-
-                print("OpenAI response:", bot_response)  # 디버깅용 로그
+                response = await generate_reply(session_id, room_id, request)
 
                 # 클라이언트로 응답 전송
-                response = {
-                    "text": bot_response.get("response", ""),
-                    "emotion": bot_response.get("emotion", "Neutral"),
-                    "favorability": bot_response.get("favorability", request.favorability)
-                }
                 await chat.send_message(websocket, session_id, response)
             except Exception as e:
                 print(f"Error in websocket_generate: {str(e)}")
@@ -303,8 +348,84 @@ async def websocket_generate(websocket: WebSocket, room_id: str):
     except Exception as e:
         print(f"Unexpected error in WebSocket handling for session {session_id}: {str(e)}")
     finally:
-        chat.disconnect(session_id)
-        print(f"Session {session_id} disconnected.")
+        chat.release(session_id, websocket)
+        print(f"WebSocket for session {session_id} disconnected.")
+
+async def handle_mux_request(websocket: WebSocket, send_lock: asyncio.Lock, data: dict):
+    """
+    멀티플렉스 연결의 요청 하나를 처리하고 같은 request_id로 응답합니다.
+    같은 채팅룸의 요청은 순서대로, 다른 채팅룸의 요청은 동시에 처리됩니다.
+    stream=true인 요청은 delta 프레임을 여러 번 보낸 뒤 final 프레임으로 끝납니다.
+    """
+    request_id = data.get("request_id")
+    room_id = data.get("room_id")
+
+    async def send(frame: dict):
+        async with send_lock:
+            await websocket.send_json({"request_id": request_id, **frame})
+
+    try:
+        request = GenerateRequest(**data.get("payload", {}))
+        async with chat.room_lock(room_id):
+            session_id = chat.room_session(room_id)
+            if data.get("stream"):
+                async for frame in stream_reply(session_id, room_id, request):
+                    if "text" in frame:
+                        await chat.log_message(session_id, "chatbot", frame["text"], frame.get("emotion"), frame.get("favorability"))
+                    await send(frame)
+                return
+
+            response = await generate_reply(session_id, room_id, request)
+            await chat.log_message(session_id, "chatbot", response["text"], response.get("emotion"), response.get("favorability"))
+    except Exception as e:
+        print(f"Error in mux request {request_id} (room {room_id}): {str(e)}")
+        response = {"type": "final", "error": str(e)} if data.get("stream") else {"error": str(e)}
+
+    try:
+        await send(response)
+    except Exception as e:
+        print(f"Error sending mux response {request_id}: {str(e)}")
+
+
+@app.websocket("/ws/mux/")
+async def websocket_mux(websocket: WebSocket):
+    """
+    메인 백엔드의 연결 풀이 사용하는 멀티플렉스 웹소켓.
+    요청마다 request_id와 room_id가 함께 오고, 채팅룸 세션은 연결과 무관하게 유지됩니다.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    tasks = set()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            task = asyncio.create_task(handle_mux_request(websocket, send_lock, data))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect as e:
+        print(f"Mux WebSocket disconnected. Reason: {e.code}")
+    except Exception as e:
+        print(f"Unexpected error in mux WebSocket: {str(e)}")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.get("/metrics/sessions")
+async def get_session_metrics():
+    """
+    활성 세션, 채팅룸, 웹소켓 수 및 비활성 시간 초과 스케줄러, 세션 저장 큐 상태.
+    """
+    return {**chat.registry.stats(), "inactivity": chat.inactivity.stats(), "persistence": chat.persister.stats()}
+
+
+@app.get("/cache/classifier")
+async def get_classifier_cache_stats():
+    """
+    분류기 캐시 크기 및 분류기별 적중률.
+    """
+    return classifier_cache.stats()
+
 
 @app.get("/")
 async def root():
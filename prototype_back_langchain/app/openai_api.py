@@ -1,10 +1,15 @@
 import json
+import asyncio
 from collections import Counter
-from chat_summary import ChatSummaryMemory
+from chat_summary import ChatSummaryMemory, load_memory_summary
+from classifier_cache import cached_classify
+from llm_backend import create_llm
 from datetime import datetime
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import Literal, Optional
 import openai
 import os
 from dotenv import load_dotenv
@@ -14,21 +19,66 @@ import logging
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-# LangChain을 위한 OpenAI LLM 인스턴스 생성
-llm = ChatOpenAI(model="gpt-4o-mini", openai_api_key=openai.api_key)
+# LangChain을 위한 LLM 인스턴스 생성 (LLM_BACKEND=stub이면 OpenAI 대신 로컬 스텁)
+llm = create_llm(openai.api_key)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 
+# 턴 처리 방식
+# three_call: 감정 예측, 호감도 분석, 캐릭터 응답을 각각 호출 (기본값)
+# single_call: 응답/감정/호감도 변화를 JSON 하나로 받는 1회 호출, 파싱 실패 시 three_call로 대체
+TURN_MODE_THREE_CALL = "three_call"
+TURN_MODE_SINGLE_CALL = "single_call"
+TURN_MODE = os.getenv("TURN_MODE", TURN_MODE_THREE_CALL)
+
+# 대화 메모리 요약 프롬프트 (최근 메시지에서 밀려난 메시지를 누적 요약에 합친다)
+MEMORY_SUMMARY_TEMPLATE = """
+        You maintain the long-term memory of a fictional character about one user.
+
+        Current memory (may be empty):
+        {summary}
+
+        Older user messages with the character's emotional reaction to each:
+        {messages}
+
+        Update the memory so it also covers these messages: what the user said about themselves, recurring topics,
+        and how the character's feelings toward the user changed. Keep it under 150 words, in the same language as the messages.
+        Provide only the updated memory.
+        """
+
+memory_summary_prompt = PromptTemplate(
+    template=MEMORY_SUMMARY_TEMPLATE,
+    input_variables=["summary", "messages"]
+)
+
+async def summarize_memory(summary, messages):
+    """
+    ChatSummaryMemory의 백그라운드 요약 함수.
+    """
+    chain = LLMChain(llm=llm, prompt=memory_summary_prompt)
+    response = await chain.ainvoke({
+        "summary": summary,
+        "messages": json.dumps(messages, ensure_ascii=False, indent=4)
+    })
+    return response.get("text", "").strip()
+
 # 대화방마다 고유한 대화 이력 관리
 class ConversationManager:
     def __init__(self):
         self.conversations = {}
 
-    def get_conversation_memory(self, room_id):
-        if room_id not in self.conversations:
-            self.conversations[room_id] = ChatSummaryMemory(max_history_length=5)
-        return self.conversations[room_id]
+    async def get_conversation_memory(self, room_id):
+        """
+        채팅방 메모리를 반환. 처음 사용하는 채팅방은 저장된 요약을 읽어 이어간다.
+        """
+        memory = self.conversations.get(room_id)
+        if memory is None:
+            summary = await run_in_threadpool(load_memory_summary, room_id)
+            memory = self.conversations.setdefault(
+                room_id, ChatSummaryMemory(room_id, summarize_memory, summary=summary, max_history_length=5)
+            )
+        return memory
 
 # ConversationManager 인스턴스 생성
 conversation_manager = ConversationManager()
@@ -49,8 +99,8 @@ def get_user_title(favorability, nickname, user_unique_name):
         logging.error(f"Error in get_user_title: {e}")
         return f"{nickname}"
 
-# 감정 예측 함수
-def predict_emotion(user_message):
+# 감정 예측 함수 (use_cache: 짧은 메시지는 분류기 캐시 사용)
+async def predict_emotion(user_message, use_cache=True):
     try:
         emotion_prompt_template = """
         Analyze the user's message and predict the emotional response of the character.
@@ -65,19 +115,20 @@ def predict_emotion(user_message):
             input_variables=["user_message"]
         )
         emotion_chain = LLMChain(llm=llm, prompt=emotion_prompt)
-        emotion = emotion_chain.invoke({"user_message": user_message})
-        return emotion.get("text", "normal").strip()
+
+        async def classify():
+            emotion = await emotion_chain.ainvoke({"user_message": user_message})
+            return emotion.get("text", "normal").strip()
+
+        return await cached_classify("emotion", user_message, use_cache, classify)
     except Exception as e:
         logging.error(f"Error in predict_emotion: {e}")
         return "neutral"
 
-# 대화방에 맞는 대화 이력 처리
-def analyze_message(user_message, dialogue_history, current_emotion):
+# 대화방 대화 이력을 바탕으로 호감도 변화 분석 (감정 예측과 동시에 실행되므로 현재 메시지는 이력에 아직 없음)
+async def analyze_message(user_message, dialogue_history):
     try:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        dialogue_history.add_message(user_message, current_emotion, timestamp)  # `dialogue_history`는 `ChatSummaryMemory` 객체
-
-        dialogue_history_json = dialogue_history.get_summary()  # 대화 이력 요약
+        dialogue_history_json = dialogue_history.get_summary()  # 누적 요약 + 최근 메시지 (`dialogue_history`는 `ChatSummaryMemory` 객체)
 
         character_prompt_template = """
         Analyze the following user message and determine how it would affect the character's favorability score towards the user.
@@ -95,28 +146,43 @@ def analyze_message(user_message, dialogue_history, current_emotion):
         )
 
         chain = LLMChain(llm=llm, prompt=character_prompt)
-        response = chain.invoke({
+
+        response = await chain.ainvoke({
             "prompt": dialogue_history_json,
             "user_message": user_message
         })
         outcome = response.get('text', '').strip()
 
         logging.info(f"Analyze Message Outcome: {outcome}")  # Outcome 확인 로그 추가
-        
+
         if outcome in ["Increase", "Decrease", "Neutral"]:
-            return outcome, dialogue_history
+            return outcome
         else:
-            return "Neutral", dialogue_history
+            return "Neutral"
 
     except Exception as e:
         logging.error(f"Error analyzing message: {e}")
-        return "Neutral", dialogue_history
-
-def adjust_favorability(user_message, favorability, room_id, current_emotion):
+        return "Neutral"
+
+async def classify_turn(user_message, room_id, use_cache=True):
+    """
+    서로 독립적인 감정 예측과 호감도 분석을 동시에 실행하고, 끝나면 메시지를 대화 이력에 추가한다.
+    use_cache=False면 감정 분류기 캐시를 사용하지 않는다 (채팅방 설정).
+    호감도 분석은 대화 이력에 따라 결과가 달라지므로 캐싱하지 않는다.
+    반환값: (예측 감정, 호감도 분석 결과, 대화 이력)
+    """
+    dialogue_history = await conversation_manager.get_conversation_memory(room_id)
+    predicted_emotion, outcome = await asyncio.gather(
+        predict_emotion(user_message, use_cache),
+        analyze_message(user_message, dialogue_history)
+    )
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    dialogue_history.add_message(user_message, predicted_emotion, timestamp)
+    return predicted_emotion, outcome, dialogue_history
+
+def adjust_favorability(favorability, outcome, updated_dialogue_history):
     try:
-        # 대화 이력 가져오기
-        dialogue_history = conversation_manager.get_conversation_memory(room_id)
-        outcome, updated_dialogue_history = analyze_message(user_message, dialogue_history, current_emotion)
         logging.info(f"Adjusting favorability based on outcome: {outcome}")  # Outcome 확인 로그 추가
 
         # 최근 감정들을 확인
@@ -130,7 +196,7 @@ def adjust_favorability(user_message, favorability, room_id, current_emotion):
 
         if emotion_counter[outcome] > 5:
             logging.info(f"Favorability unchanged as the outcome emotion '{outcome}' is too frequent.")  # 감정이 자주 나타나면 호감도 조정 안함
-            return favorability, updated_dialogue_history
+            return favorability
 
         if outcome == "Increase":
             favorability += 5
@@ -143,29 +209,14 @@ def adjust_favorability(user_message, favorability, room_id, current_emotion):
 
         logging.info(f"Updated favorability: {favorability}")  # 변경된 호감도 확인 로그 추가
 
-        return favorability, updated_dialogue_history
+        return favorability
 
     except Exception as e:
         logging.error(f"Favorability Adjustment Error: {e}")
-        return favorability, dialogue_history
+        return favorability
 
-def get_openai_response(
-        user_message: str,
-        character_name: str,
-        nickname: str,
-        user_unique_name: str,
-        user_introduction: str,
-        favorability: int,
-        appearance: str,
-        personality: str,
-        background: str,
-        speech_style: str,
-        example_dialogues: list,
-        chat_history: str,
-        room_id: str
-    ) -> dict:
-    try:
-        character_prompt_template = """
+# 캐릭터 응답 프롬프트 (일반/스트리밍 응답 공통)
+CHARACTER_PROMPT_TEMPLATE = """
         You are a fictional character. Stay true to your character's traits and context while interacting with the user. Below is your character information:
         - **Appearance**: {appearance}
         - **Personality**: {personality}
@@ -176,6 +227,9 @@ def get_openai_response(
         Recent conversation history:
         {chat_history}
 
+        Your long-term memory of the user:
+        {memory_summary}
+
         Your emotional state: {emotion}. Adapt your tone and sentence structure accordingly.
         Your **favorability score** toward the user is: {favorability}.  
 
@@ -203,34 +257,189 @@ def get_openai_response(
         **Remember**: Your responses should reflect the essence of your character's traits, adapt dynamically to the interaction, and stay in character at all times.
         """
 
-        predicted_emotion = predict_emotion(user_message)
-        user_title = get_user_title(favorability, nickname, user_unique_name)
-        new_favorability, updated_dialogue_history = adjust_favorability(user_message, favorability, room_id, predicted_emotion)  
+character_prompt = PromptTemplate(
+    template=CHARACTER_PROMPT_TEMPLATE,
+    input_variables=[
+        "appearance", "personality", "background", "speech_style", "example_dialogues",
+        "character_name", "user_message", "favorability", "emotion", "user_title","user_introduction", "chat_history",
+        "memory_summary"
+    ]
+)
+
+# 1회 호출 모드 응답 스키마
+class StructuredTurn(BaseModel):
+    reply: str
+    emotion: Literal["Happy", "Sad", "Angry", "Confused", "Grateful", "Embarrassed", "Nervous", "Neutral"]
+    favorability_outcome: Literal["Increase", "Decrease", "Neutral"]
+
+# 1회 호출 모드 프롬프트: 캐릭터 응답 프롬프트에 감정/호감도 판단과 JSON 출력 형식을 덧붙인다.
+STRUCTURED_TURN_TEMPLATE = CHARACTER_PROMPT_TEMPLATE + """
+        **Recent user messages and your emotions**:
+        {dialogue_summary}
+
+        In the same step, decide:
+        - "emotion": your emotional response to the current user input. One of: Happy, Sad, Angry, Confused, Grateful, Embarrassed, Nervous, Neutral.
+        - "favorability_outcome": how the current user input affects your favorability toward the user. One of: Increase, Decrease, Neutral.
+
+        Respond with only a JSON object, without code fences, in this format:
+        {{"reply": "<your in-character reply>", "emotion": "<emotion>", "favorability_outcome": "<outcome>"}}
+        """
 
-        character_prompt = PromptTemplate(
-            template=character_prompt_template,
-            input_variables=[ 
-                "appearance", "personality", "background", "speech_style", "example_dialogues",
-                "character_name", "user_message", "favorability", "emotion", "user_title","user_introduction", "chat_history"
-            ]
+structured_turn_prompt = PromptTemplate(
+    template=STRUCTURED_TURN_TEMPLATE,
+    input_variables=[
+        "appearance", "personality", "background", "speech_style", "example_dialogues",
+        "character_name", "user_message", "favorability", "emotion", "user_title","user_introduction", "chat_history",
+        "memory_summary", "dialogue_summary"
+    ]
+)
+
+def resolve_turn_mode(turn_mode: Optional[str]) -> str:
+    """
+    채팅방 설정(turn_mode)이 있으면 우선 사용하고, 없으면 배포 설정(TURN_MODE)을 사용한다.
+    """
+    mode = turn_mode or TURN_MODE
+    return mode if mode in (TURN_MODE_THREE_CALL, TURN_MODE_SINGLE_CALL) else TURN_MODE_THREE_CALL
+
+def parse_structured_turn(text: str) -> Optional[StructuredTurn]:
+    try:
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`").removeprefix("json").strip()
+        return StructuredTurn(**json.loads(text))
+    except (ValueError, TypeError, ValidationError) as e:
+        logging.warning(f"Structured turn parse failed: {e}")
+        return None
+
+async def get_structured_response(
+        user_message: str,
+        character_name: str,
+        nickname: str,
+        user_unique_name: str,
+        user_introduction: str,
+        favorability: int,
+        appearance: str,
+        personality: str,
+        background: str,
+        speech_style: str,
+        example_dialogues: list,
+        chat_history: str,
+        room_id: str
+    ) -> Optional[dict]:
+    """
+    응답, 감정, 호감도 변화를 LLM 1회 호출로 생성한다.
+    스키마 검증에 실패하면 None을 반환하며, 이때 대화 이력은 변경하지 않는다.
+    """
+    dialogue_history = await conversation_manager.get_conversation_memory(room_id)
+    chain = LLMChain(llm=llm, prompt=structured_turn_prompt)
+    response = await chain.ainvoke({
+        "appearance": appearance,
+        "personality": personality,
+        "background": background,
+        "speech_style": speech_style,
+        "example_dialogues": example_dialogues,
+        "character_name": character_name,
+        "user_message": user_message,
+        "favorability": favorability,
+        "emotion": "decide it from the current user input",
+        "user_title": get_user_title(favorability, nickname, user_unique_name),
+        "user_introduction": user_introduction,
+        "chat_history": chat_history,
+        "memory_summary": dialogue_history.summary or "(none yet)",
+        "dialogue_summary": json.dumps(dialogue_history.get_recent_messages(), ensure_ascii=False, indent=4)
+    })
+
+    turn = parse_structured_turn(response.get("text", ""))
+    if turn is None:
+        return None
+
+    logging.info(f"Structured turn: emotion={turn.emotion}, outcome={turn.favorability_outcome}")
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    dialogue_history.add_message(user_message, turn.emotion, timestamp)
+    return {
+        "response": turn.reply,
+        "favorability": adjust_favorability(favorability, turn.favorability_outcome, dialogue_history),
+        "emotion": turn.emotion
+    }
+
+async def prepare_character_reply(
+        user_message: str,
+        character_name: str,
+        nickname: str,
+        user_unique_name: str,
+        user_introduction: str,
+        favorability: int,
+        appearance: str,
+        personality: str,
+        background: str,
+        speech_style: str,
+        example_dialogues: list,
+        chat_history: str,
+        room_id: str,
+        classifier_cache: bool = True
+    ):
+    """
+    감정 예측과 호감도 조정을 수행하고 캐릭터 응답 프롬프트 입력값을 만든다.
+    반환값: (프롬프트 입력 dict, 예측 감정, 조정된 호감도)
+    """
+    predicted_emotion, outcome, updated_dialogue_history = await classify_turn(user_message, room_id, classifier_cache)
+    user_title = get_user_title(favorability, nickname, user_unique_name)
+    new_favorability = adjust_favorability(favorability, outcome, updated_dialogue_history)
+
+    inputs = {
+        "appearance": appearance,
+        "personality": personality,
+        "background": background,
+        "speech_style": speech_style,
+        "example_dialogues": example_dialogues,
+        "character_name": character_name,
+        "user_message": user_message,
+        "favorability": new_favorability,
+        "emotion": predicted_emotion,
+        "user_title": user_title,
+        "user_introduction": user_introduction,
+        "chat_history": chat_history,
+        "memory_summary": updated_dialogue_history.summary or "(none yet)"
+    }
+    return inputs, predicted_emotion, new_favorability
+
+async def get_openai_response(
+        user_message: str,
+        character_name: str,
+        nickname: str,
+        user_unique_name: str,
+        user_introduction: str,
+        favorability: int,
+        appearance: str,
+        personality: str,
+        background: str,
+        speech_style: str,
+        example_dialogues: list,
+        chat_history: str,
+        room_id: str,
+        turn_mode: Optional[str] = None,
+        classifier_cache: bool = True
+    ) -> dict:
+    try:
+        if resolve_turn_mode(turn_mode) == TURN_MODE_SINGLE_CALL:
+            structured = await get_structured_response(
+                user_message, character_name, nickname, user_unique_name, user_introduction, favorability,
+                appearance, personality, background, speech_style, example_dialogues, chat_history, room_id
+            )
+            if structured is not None:
+                return structured
+            logging.info("Falling back to three-call turn")
+
+        inputs, predicted_emotion, new_favorability = await prepare_character_reply(
+            user_message, character_name, nickname, user_unique_name, user_introduction, favorability,
+            appearance, personality, background, speech_style, example_dialogues, chat_history, room_id,
+            classifier_cache
         )
 
         chain = LLMChain(llm=llm, prompt=character_prompt)
 
-        response = chain.invoke({
-            "appearance": appearance,
-            "personality": personality,
-            "background": background,
-            "speech_style": speech_style,
-            "example_dialogues": example_dialogues,
-            "character_name": character_name,
-            "user_message": user_message,
-            "favorability": new_favorability,
-            "emotion": predicted_emotion,
-            "user_title": user_title,
-            "user_introduction": user_introduction,
-            "chat_history": chat_history
-        })
+        response = await chain.ainvoke(inputs)
 
         logging.info(f"OpenAI response: {response}")  # OpenAI 응답 로그 추가
 
@@ -253,4 +462,67 @@ def get_openai_response(
             "error": str(e),
             "updated_likes": favorability,
             "emotion": "Neutral"
-        }   
\ No newline at end of file
+        }
+
+async def stream_openai_response(
+        user_message: str,
+        character_name: str,
+        nickname: str,
+        user_unique_name: str,
+        user_introduction: str,
+        favorability: int,
+        appearance: str,
+        personality: str,
+        background: str,
+        speech_style: str,
+        example_dialogues: list,
+        chat_history: str,
+        room_id: str,
+        turn_mode: Optional[str] = None,
+        classifier_cache: bool = True
+    ):
+    """
+    캐릭터 응답을 토큰 단위로 생성하는 비동기 제너레이터.
+    {"delta": 텍스트 조각}을 차례로 내보내고, 마지막에 get_openai_response와 같은 형식의 결과를 내보낸다.
+    single_call 모드는 JSON 응답을 검증한 뒤에야 응답 텍스트를 알 수 있으므로 응답 전체를 delta 하나로 보낸다.
+    """
+    try:
+        if resolve_turn_mode(turn_mode) == TURN_MODE_SINGLE_CALL:
+            structured = await get_structured_response(
+                user_message, character_name, nickname, user_unique_name, user_introduction, favorability,
+                appearance, personality, background, speech_style, example_dialogues, chat_history, room_id
+            )
+            if structured is not None:
+                yield {"delta": structured["response"]}
+                yield structured
+                return
+            logging.info("Falling back to three-call turn")
+
+        inputs, predicted_emotion, new_favorability = await prepare_character_reply(
+            user_message, character_name, nickname, user_unique_name, user_introduction, favorability,
+            appearance, personality, background, speech_style, example_dialogues, chat_history, room_id,
+            classifier_cache
+        )
+
+        chunks = []
+        async for chunk in (character_prompt | llm).astream(inputs):
+            if chunk.content:
+                chunks.append(chunk.content)
+                yield {"delta": chunk.content}
+
+        response_text = "".join(chunks)
+        logging.info(f"OpenAI streamed response: {response_text}")
+
+        yield {
+            "response": response_text,
+            "favorability": new_favorability,
+            "emotion": predicted_emotion
+        }
+
+    except Exception as e:
+        logging.error(f"Error in stream_openai_response: {e}")
+        yield {
+            "error": str(e),
+            "updated_likes": favorability,
+            "emotion": "Neutral"
+        }
@@ -0,0 +1,178 @@
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, ChatLog, ChatMessage
+from transcript import LogWriter
+from datetime import datetime
+from typing import List, Optional
+from dotenv import load_dotenv
+import asyncio
+import os
+
+# 종료된 세션의 대화 기록 저장 작업자
+# 세션 종료(disconnect)는 저장할 세션을 큐에 넣기만 하고, 백그라운드 작업이 여러 세션을 모아
+# 스레드풀에서 로그 파일 / 메시지 파일을 읽어 chat_logs / chat_messages에 한 번에 저장한다.
+# 이벤트 루프는 파일/DB 작업을 기다리지 않는다.
+# DB 오류 시 백오프 후 다시 시도하며, 저장되기 전까지 로그 파일과 메시지 파일은 지우지 않는다.
+
+load_dotenv()
+
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "100"))  # 한 번에 저장할 최대 세션 수
+PERSIST_MAX_ATTEMPTS = 3  # 배치 저장 재시도 횟수 (넘으면 세션별로 나눠 저장)
+PERSIST_MAX_REQUEUES = 10  # 세션 하나가 계속 실패할 때 큐에 다시 넣는 최대 횟수 (넘으면 로그 파일만 남김)
+PERSIST_RETRY_BASE_DELAY = 0.5  # 초 단위
+PERSIST_RETRY_MAX_DELAY = 30
+PERSIST_SHUTDOWN_TIMEOUT = 10  # 서버 종료 시 큐를 비우며 기다리는 최대 시간 (초)
+
+# 대화 저장 방식: db = 대화 기록과 요약을 DB에 저장/조회, off = DB를 읽거나 쓰지 않음 (부하 테스트용)
+CHAT_PERSISTENCE = os.getenv("CHAT_PERSISTENCE", "db")
+PERSISTENCE_ENABLED = CHAT_PERSISTENCE != "off"
+
+
+class SessionPersister:
+    def __init__(self, log_writer: LogWriter, batch_size: int = PERSIST_BATCH_SIZE):
+        self.log_writer = log_writer
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.saved = 0  # 저장한 세션 수
+        self.retries = 0  # 재시도 횟수
+        self.abandoned = 0  # 재시도를 포기하고 로그 파일만 남긴 세션 수
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, session_id: str, room_id: str, end_time: str):
+        self.queue.put_nowait({
+            "session_id": session_id,
+            "room_id": room_id,
+            "end_time": end_time,
+            "requeues": 0,
+        })
+
+    def build_rows(self, item: dict):
+        """
+        로그 파일과 메시지 파일로 chat_logs / chat_messages 행을 만든다.
+        """
+        session_id = item["session_id"]
+        self.log_writer.flush_session(session_id)
+        with open(self.log_writer.log_path(session_id), "r", encoding="utf-8") as log_file:
+            log_content = log_file.read()
+
+        # 로그파일에서 세션시작시간 추출
+        try:
+            start_time = next(
+                line.split(": ")[-1] for line in log_content.splitlines()
+                if "Session opened at:" in line
+            )
+            start_time = datetime.strptime(start_time.strip(), "%Y-%m-%d %H:%M:%S")  # 문자열 -> datetime 변환
+        except StopIteration:
+            raise ValueError("로그 파일에 'Session opened at:'이 없습니다.")
+
+        chat_log = {
+            "session_id": session_id,
+            "chat_id": item["room_id"],
+            "start_time": start_time,
+            "end_time": item["end_time"],
+            "log": log_content,
+        }
+        messages = [
+            {
+                "chat_id": item["room_id"],
+                "session_id": session_id,
+                "sender": message["sender"],
+                "message": message["message"],
+                "emotion": message["emotion"],
+                "favorability": message["favorability"],
+                "created_at": datetime.strptime(message["timestamp"], "%Y-%m-%d %H:%M:%S"),
+            }
+            for message in self.log_writer.read_messages(session_id)
+        ]
+        return chat_log, messages
+
+    def write_batch(self, batch: List[dict]):
+        """
+        세션 여러 개를 트랜잭션 하나로 저장하고, 저장이 끝난 로그 파일과 메시지 파일을 지운다.
+        """
+        chat_logs, messages = [], []
+        for item in batch:
+            chat_log, session_messages = self.build_rows(item)
+            chat_logs.append(chat_log)
+            messages.extend(session_messages)
+
+        with SessionLocal() as db:
+            db.bulk_insert_mappings(ChatLog, chat_logs)
+            db.bulk_insert_mappings(ChatMessage, messages)
+            db.commit()
+
+        for item in batch:
+            for path in self.log_writer.session_paths(item["session_id"]):
+                if not os.path.exists(path):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error removing saved log file {path}: {e}")
+
+    async def persist(self, batch: List[dict]):
+        """
+        배치를 저장한다. 재시도해도 실패하면 세션별로 나눠 저장하고,
+        그래도 실패한 세션은 큐 뒤에 다시 넣어 다른 세션 저장을 막지 않게 한다.
+        """
+        for attempt in range(PERSIST_MAX_ATTEMPTS):
+            try:
+                await run_in_threadpool(self.write_batch, batch)
+                self.saved += len(batch)
+                return
+            except Exception as e:
+                self.retries += 1
+                print(f"Error saving {len(batch)} sessions to database (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(min(PERSIST_RETRY_BASE_DELAY * (2 ** attempt), PERSIST_RETRY_MAX_DELAY))
+
+        if len(batch) > 1:
+            for item in batch:
+                await self.persist([item])
+            return
+
+        item = batch[0]
+        item["requeues"] += 1
+        if item["requeues"] > PERSIST_MAX_REQUEUES:
+            self.abandoned += 1
+            print(f"Giving up saving session {item['session_id']}; log file kept in {self.log_writer.logs_path}")
+            return
+        self.queue.put_nowait(item)
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.persist(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        큐에 남은 세션을 최대 PERSIST_SHUTDOWN_TIMEOUT초 동안 저장한 뒤 작업을 멈춘다.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), PERSIST_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Session persister stopped with {self.queue.qsize()} sessions queued; log files kept")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "saved": self.saved,
+            "retries": self.retries,
+            "abandoned": self.abandoned,
+        }
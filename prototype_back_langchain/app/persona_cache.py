@@ -0,0 +1,116 @@
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, ChatRoom, CharacterPrompt, Character
+from collections import OrderedDict
+from typing import List, Any, Optional, Tuple
+from dotenv import load_dotenv
+import threading
+import os
+
+# 채팅방별 캐릭터 페르소나 캐시
+# 메인 백엔드는 매 턴마다 room_id, 메시지, 호감도, 페르소나 버전만 보내고,
+# 페르소나(외형/성격/배경/말투/예시 대화/호칭)는 버전이 바뀌었을 때만 DB에서 한 번 읽는다.
+
+load_dotenv()
+
+PERSONA_CACHE_SIZE = int(os.getenv("PERSONA_CACHE_SIZE", "1024"))
+
+
+class Persona(BaseModel):
+    character_name: str
+    nickname: dict
+    user_unique_name: Optional[str]
+    user_introduction: Optional[str]
+    character_appearance: str
+    character_personality: str
+    character_background: str
+    character_speech_style: str
+    example_dialogues: List[Any]
+    turn_mode: Optional[str] = None  # 채팅방 턴 처리 방식 설정
+    classifier_cache: bool = True  # 채팅방 분류기 캐시 사용 여부
+
+
+def persona_version(char_prompt_id: int, current_prompt_id: Optional[int]) -> str:
+    """
+    페르소나 버전: 채팅방 프롬프트 + 캐릭터 최신 프롬프트.
+    캐릭터 수정 시 항상 새 프롬프트가 생성되므로 이름/호칭 변경도 버전에 반영된다.
+    메인 백엔드의 main.persona_version과 같은 형식이어야 한다.
+    """
+    return f"{char_prompt_id}:{current_prompt_id}"
+
+
+class PersonaCache:
+    """
+    room_id -> (버전, Persona) LRU 캐시. 요청 버전과 다르면 캐시 미스로 처리한다.
+    """
+    def __init__(self, maxsize: int = PERSONA_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, room_id: str, version: Optional[str]) -> Optional[Persona]:
+        with self._lock:
+            entry = self._data.get(room_id)
+            if entry is None or (version is not None and entry[0] != version):
+                return None
+            self._data.move_to_end(room_id)
+            return entry[1]
+
+    def set(self, room_id: str, version: str, persona: Persona):
+        with self._lock:
+            self._data[room_id] = (version, persona)
+            self._data.move_to_end(room_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+persona_cache = PersonaCache()
+
+
+def load_persona(room_id: str) -> Optional[Tuple[str, Persona]]:
+    """
+    DB에서 채팅방의 페르소나와 현재 버전을 읽는다.
+    """
+    with SessionLocal() as db:
+        row = (
+            db.query(ChatRoom, CharacterPrompt, Character)
+            .join(CharacterPrompt, ChatRoom.char_prompt_id == CharacterPrompt.char_prompt_id)
+            .join(Character, CharacterPrompt.char_idx == Character.char_idx)
+            .filter(ChatRoom.chat_id == room_id, ChatRoom.is_active == True)
+            .first()
+        )
+    if row is None:
+        return None
+
+    room, prompt, character = row
+    persona = Persona(
+        character_name=character.char_name,
+        nickname=character.nicknames or {'30': '', '70': '', '100': ''},
+        user_unique_name=room.user_unique_name,
+        user_introduction=room.user_introduction,
+        character_appearance=prompt.character_appearance,
+        character_personality=prompt.character_personality,
+        character_background=prompt.character_background,
+        character_speech_style=prompt.character_speech_style,
+        example_dialogues=prompt.example_dialogues or [],
+        turn_mode=room.turn_mode,
+        classifier_cache=room.classifier_cache,
+    )
+    return persona_version(room.char_prompt_id, character.current_prompt_id), persona
+
+
+async def get_persona(room_id: str, version: Optional[str]) -> Persona:
+    """
+    캐시된 페르소나를 반환하고, 없거나 버전이 다르면 DB에서 읽어 캐싱한다.
+    """
+    persona = persona_cache.get(room_id, version)
+    if persona is not None:
+        return persona
+
+    loaded = await run_in_threadpool(load_persona, room_id)
+    if loaded is None:
+        raise ValueError(f"채팅방 {room_id}의 페르소나를 찾을 수 없습니다.")
+
+    loaded_version, persona = loaded
+    persona_cache.set(room_id, loaded_version, persona)
+    return persona
@@ -0,0 +1,68 @@
+from fastapi import WebSocket
+from typing import Dict, Optional, Set
+import uuid
+
+# 채팅 세션 레지스트리
+# 세션 ID와 채팅룸 ID 양쪽으로 바로 찾을 수 있게 색인하고, 한 채팅룸 세션에 여러 웹소켓(여러 탭/기기)을 붙인다.
+# 웹소켓이 모두 떠나면 세션을 닫을 수 있도록 연결 수를 센다.
+# 멀티플렉스 연결의 채팅룸 세션은 웹소켓 없이 존재하며 비활성 시간 초과로만 닫힌다.
+
+
+class ChatSession:
+    def __init__(self, session_id: str, room_id: str):
+        self.session_id = session_id
+        self.room_id = room_id
+        self.websockets: Set[WebSocket] = set()
+
+
+class SessionRegistry:
+    def __init__(self):
+        self.sessions: Dict[str, ChatSession] = {}  # 세션 ID -> 세션
+        self.room_sessions: Dict[str, str] = {}  # 채팅룸 ID -> 세션 ID
+        self.socket_count = 0
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        return self.sessions.get(session_id)
+
+    def for_room(self, room_id: str) -> Optional[ChatSession]:
+        session_id = self.room_sessions.get(room_id)
+        return self.sessions.get(session_id) if session_id else None
+
+    def create(self, room_id: str) -> ChatSession:
+        session = ChatSession(str(uuid.uuid4()), room_id)
+        self.sessions[session.session_id] = session
+        self.room_sessions[room_id] = session.session_id
+        return session
+
+    def attach(self, session: ChatSession, websocket: WebSocket):
+        if websocket not in session.websockets:
+            session.websockets.add(websocket)
+            self.socket_count += 1
+
+    def detach(self, session_id: str, websocket: WebSocket) -> int:
+        """
+        웹소켓을 세션에서 떼고 남은 웹소켓 수를 반환한다 (세션이 이미 없으면 0).
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return 0
+        if websocket in session.websockets:
+            session.websockets.discard(websocket)
+            self.socket_count -= 1
+        return len(session.websockets)
+
+    def remove(self, session_id: str) -> Optional[ChatSession]:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        if self.room_sessions.get(session.room_id) == session_id:
+            del self.room_sessions[session.room_id]
+        self.socket_count -= len(session.websockets)
+        return session
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "rooms": len(self.room_sessions),
+            "sockets": self.socket_count,
+        }
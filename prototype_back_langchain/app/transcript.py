@@ -0,0 +1,161 @@
+from starlette.concurrency import run_in_threadpool
+from collections import deque
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+import threading
+import json
+import asyncio
+import time
+import os
+
+# 세션 대화 기록
+# 대화 내용은 세션별 메모리 링 버퍼(TranscriptBuffer)에서 읽고,
+# 로그 파일(chat_logs/{session_id}.log)과 메시지 파일(chat_logs/{session_id}.messages.jsonl)은
+# 백그라운드 작업(LogWriter)이 모아서 한 번에 추가 기록한다.
+# 파일은 세션 종료 시 DB에 저장하기 위한 내구성 용도로만 쓰며, 세션 전체 메시지를 메모리에 두지 않는다.
+
+load_dotenv()
+
+TRANSCRIPT_BUFFER_SIZE = int(os.getenv("TRANSCRIPT_BUFFER_SIZE", "200"))  # 세션별로 메모리에 두는 최근 메시지 수
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.05"))  # 로그 파일 기록 주기 (초)
+# fsync 정책: always = 기록할 때마다, interval = LOG_FSYNC_INTERVAL초마다, never = OS에 맡김
+LOG_FSYNC = os.getenv("LOG_FSYNC", "interval")
+LOG_FSYNC_INTERVAL = float(os.getenv("LOG_FSYNC_INTERVAL", "1"))
+
+
+class TranscriptBuffer:
+    """
+    세션의 최근 메시지 (시각, 보낸 사람, 내용, 감정, 호감도) 링 버퍼.
+    """
+    def __init__(self, maxlen: int = TRANSCRIPT_BUFFER_SIZE):
+        self.turns = deque(maxlen=maxlen)
+        self.message_count = 0  # 버퍼에서 밀려난 메시지 포함 전체 메시지 수
+
+    def append(self, timestamp: str, sender: str, message: str, emotion: Optional[str] = None, favorability: Optional[int] = None):
+        turn = {"timestamp": timestamp, "sender": sender, "message": message, "emotion": emotion, "favorability": favorability}
+        self.turns.append(turn)
+        self.message_count += 1
+        return turn
+
+    @property
+    def has_content(self) -> bool:
+        return self.message_count > 0
+
+    def render(self) -> str:
+        """
+        로그 파일과 같은 '[시각] 보낸 사람: 내용' 형식의 대화 기록.
+        """
+        return "".join(f"[{turn['timestamp']}] {turn['sender']}: {turn['message']}\n" for turn in self.turns)
+
+
+class LogWriter:
+    """
+    로그 파일 / 메시지 파일 추가 기록을 모아서 LOG_FLUSH_INTERVAL마다 파일별로 한 번씩 쓴다.
+    파일 쓰기는 스레드풀에서 실행하며, 기록 순서는 _write_lock으로 보장한다.
+    """
+    def __init__(self, logs_path: str, fsync: str = LOG_FSYNC):
+        self.logs_path = logs_path
+        self.fsync = fsync
+        self._pending: Dict[str, List[str]] = {}  # 파일 경로 -> 아직 기록하지 않은 줄
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def log_path(self, session_id: str) -> str:
+        return f"{self.logs_path}/{session_id}.log"
+
+    def messages_path(self, session_id: str) -> str:
+        return f"{self.logs_path}/{session_id}.messages.jsonl"
+
+    def session_paths(self, session_id: str) -> List[str]:
+        return [self.log_path(session_id), self.messages_path(session_id)]
+
+    def _append(self, path: str, line: str):
+        with self._pending_lock:
+            self._pending.setdefault(path, []).append(line)
+
+    def append(self, session_id: str, line: str):
+        self._append(self.log_path(session_id), line)
+
+    def append_message(self, session_id: str, message: dict):
+        """
+        chat_messages에 저장할 메시지 한 개를 메시지 파일에 JSON 한 줄로 추가한다.
+        """
+        self._append(self.messages_path(session_id), json.dumps(message, ensure_ascii=False) + "\n")
+
+    def read_messages(self, session_id: str) -> List[dict]:
+        """
+        메시지 파일의 메시지 목록 (파일이 없으면 빈 목록).
+        """
+        path = self.messages_path(session_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as messages_file:
+            return [json.loads(line) for line in messages_file if line.strip()]
+
+    def discard(self, session_id: str):
+        """
+        기록하지 않은 줄을 버리고 로그 파일과 메시지 파일을 삭제 (대화 내용이 없는 세션).
+        """
+        with self._write_lock:
+            for path in self.session_paths(session_id):
+                with self._pending_lock:
+                    self._pending.pop(path, None)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write(self, pending: Dict[str, List[str]], fsync: bool):
+        for path, lines in pending.items():
+            with open(path, "a", encoding="utf-8") as log_file:
+                log_file.write("".join(lines))
+                if fsync:
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+
+    def _should_fsync(self) -> bool:
+        if self.fsync == "always":
+            return True
+        if self.fsync == "interval" and time.monotonic() - self._last_fsync >= LOG_FSYNC_INTERVAL:
+            self._last_fsync = time.monotonic()
+            return True
+        return False
+
+    def write_pending(self):
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._write(pending, self._should_fsync())
+
+    def flush_session(self, session_id: str):
+        """
+        세션의 기록하지 않은 줄을 바로 파일에 쓴다 (세션 종료 시 파일을 읽기 전에 호출).
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                pending = {path: self._pending.pop(path) for path in self.session_paths(session_id) if path in self._pending}
+            if pending:
+                self._write(pending, self.fsync != "never")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            try:
+                await run_in_threadpool(self.write_pending)
+            except Exception as e:
+                print(f"Error writing chat logs: {e}")
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.write_pending()
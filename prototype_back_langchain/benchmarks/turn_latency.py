@@ -0,0 +1,91 @@
+"""
+채팅 한 턴(감정 예측 + 호감도 분석 + 캐릭터 응답)의 지연 시간 벤치마크.
+
+OpenAI 대신 지정한 지연 시간만큼 기다렸다 응답하는 스텁 LLM(llm_backend.StubChatModel)을 사용해서
+세 번의 호출을 순서대로 실행했을 때(sequential)와 현재 파이프라인(concurrent)을 비교한다.
+매 턴 같은 메시지를 보내므로 감정 분류기 캐시는 끄고 측정한다 (캐시 적중 시 LLM 호출이 빠져 비교가 무의미해짐).
+
+    python benchmarks/turn_latency.py --latency 0.5 --turns 10
+
+채팅방 메모리 요약을 읽으므로 DATABASE_URL의 DB가 필요하다. 측정 예 (스텁, 분류기 캐시 끔):
+    latency 0.5s, 10턴: sequential 평균 1.518s, concurrent 평균 1.009s
+    latency 0.2s, 20턴: sequential 평균 0.614s, concurrent 평균 0.409s
+"""
+from langchain.chains import LLMChain
+from langchain.prompts import PromptTemplate
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import time
+import sys
+import os
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")  # 스텁으로 교체하므로 실제 키는 필요 없음
+os.environ.setdefault("LLM_BACKEND", "stub")
+
+import openai_api  # noqa: E402
+from llm_backend import StubChatModel  # noqa: E402
+
+
+TURN_ARGUMENTS = dict(
+    user_message="오늘 하루 어땠어?",
+    character_name="벤치마크",
+    nickname={"30": "", "70": "", "100": ""},
+    user_unique_name=None,
+    user_introduction="",
+    favorability=50,
+    appearance="",
+    personality="",
+    background="",
+    speech_style="",
+    example_dialogues=[],
+    chat_history="",
+)
+
+
+async def sequential_turn(room_id: str):
+    """
+    이전 파이프라인과 같은 순서: 감정 예측 -> 호감도 분석 -> 캐릭터 응답을 하나씩 기다린다.
+    """
+    await openai_api.predict_emotion(TURN_ARGUMENTS["user_message"], use_cache=False)
+    await openai_api.analyze_message(
+        TURN_ARGUMENTS["user_message"], await openai_api.conversation_manager.get_conversation_memory(room_id)
+    )
+    chain = LLMChain(llm=openai_api.llm, prompt=PromptTemplate.from_template("{user_message}"))
+    await chain.ainvoke({"user_message": TURN_ARGUMENTS["user_message"]})
+
+
+async def concurrent_turn(room_id: str):
+    await openai_api.get_openai_response(**TURN_ARGUMENTS, room_id=room_id, classifier_cache=False)
+
+
+async def measure(turn, turns: int) -> list:
+    timings = []
+    for index in range(turns):
+        started = time.perf_counter()
+        await turn(f"benchmark-{turn.__name__}-{index}")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="스텁 LLM 호출 1회당 지연 시간 (초)")
+    parser.add_argument("--turns", type=int, default=10, help="측정할 턴 수")
+    args = parser.parse_args()
+
+    openai_api.llm = StubChatModel(latency=args.latency, distribution="fixed")
+
+    print(f"stub latency: {args.latency:.3f}s, turns: {args.turns}")
+    for turn in (sequential_turn, concurrent_turn):
+        timings = await measure(turn, args.turns)
+        print(
+            f"{turn.__name__:>16}: mean {statistics.mean(timings):.3f}s, "
+            f"min {min(timings):.3f}s, max {max(timings):.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
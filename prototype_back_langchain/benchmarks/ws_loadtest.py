@@ -0,0 +1,136 @@
+"""
+LangChain 서버 웹소켓(/ws/generate/) 부하 테스트.
+
+세션(채팅방) N개를 동시에 열고 세션마다 턴을 순서대로 보내서 처리량과 턴 지연 시간(p50/p95/p99)을 측정한다.
+동시에 GET /를 주기적으로 호출해 이벤트 루프가 막히는 시간(probe 지연)도 측정한다.
+OpenAI 비용 없이 측정하려면 서버를 스텁 LLM으로 실행한다.
+부하 테스트 채팅방은 chat_rooms에 없으므로 CHAT_PERSISTENCE=off로 실행해서 세션 저장과 대화 기록/요약 DB 조회를 끈다
+(끄지 않으면 세션 종료마다 chat_logs 외래 키 오류로 저장 재시도가 반복된다).
+
+    CHAT_PERSISTENCE=off LLM_BACKEND=stub STUB_LLM_LATENCY=0.5 uvicorn main:app --port 8001
+    python benchmarks/ws_loadtest.py --url ws://localhost:8001 --sessions 50 --turns 10 --no-db
+"""
+from urllib.parse import urlparse
+import websockets
+import argparse
+import asyncio
+import statistics
+import json
+import time
+import uuid
+
+MESSAGES = ["안녕!", "ㅋㅋㅋㅋ", "오늘 하루 어땠어?", "요즘 무슨 생각 해?", "고마워 😊", "잘 자"]
+
+
+def turn_payload(index: int, no_db: bool) -> dict:
+    """
+    페르소나를 요청에 모두 담아 보낸다 (서버 페르소나 캐시/DB 조회 없이 처리).
+    no_db면 대화 기록도 빈 값으로 보내 서버가 DB에서 기록을 읽지 않게 한다.
+    """
+    payload = {
+        "user_message": MESSAGES[index % len(MESSAGES)],
+        "favorability": 50,
+        "character_name": "부하테스트",
+        "nickname": {"30": "", "70": "", "100": ""},
+        "user_unique_name": None,
+        "user_introduction": "",
+        "character_appearance": "",
+        "character_personality": "",
+        "character_background": "",
+        "character_speech_style": "",
+        "example_dialogues": [],
+    }
+    if no_db:
+        payload["chat_history"] = ""
+    return payload
+
+
+def percentile(values: list, percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def describe(name: str, values: list) -> str:
+    if not values:
+        return f"{name}: no samples"
+    return (
+        f"{name}: p50 {percentile(values, 50) * 1000:.1f}ms, p95 {percentile(values, 95) * 1000:.1f}ms, "
+        f"p99 {percentile(values, 99) * 1000:.1f}ms, max {max(values) * 1000:.1f}ms"
+    )
+
+
+async def run_session(url: str, session_index: int, turns: int, no_db: bool, latencies: list, errors: list):
+    room_id = f"loadtest-{uuid.uuid4().hex[:8]}-{session_index}"
+    try:
+        async with websockets.connect(f"{url}/ws/generate/?room_id={room_id}", max_size=None) as websocket:
+            for index in range(turns):
+                started = time.perf_counter()
+                await websocket.send(json.dumps(turn_payload(session_index + index, no_db)))
+                response = json.loads(await websocket.recv())
+                if "error" in response:
+                    errors.append(response["error"])
+                else:
+                    latencies.append(time.perf_counter() - started)
+    except Exception as e:
+        errors.append(f"session {session_index}: {e}")
+
+
+async def probe_event_loop(url: str, interval: float, samples: list, stop: asyncio.Event):
+    """
+    GET /의 응답 시간. 서버 이벤트 루프가 동기 작업으로 막히면 이 값이 늘어난다.
+    """
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or (443 if parsed.scheme == "wss" else 80)
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(host, port, ssl=parsed.scheme == "wss")
+            writer.write(f"GET / HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            await reader.read()
+            writer.close()
+            samples.append(time.perf_counter() - started)
+        except Exception as e:
+            print(f"probe error: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://localhost:8001", help="LangChain 서버 주소")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 세션 수")
+    parser.add_argument("--turns", type=int, default=10, help="세션당 턴 수")
+    parser.add_argument("--ramp", type=float, default=0.0, help="세션을 모두 여는 데 걸리는 시간 (초)")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="이벤트 루프 probe 간격 (초)")
+    parser.add_argument("--no-db", action="store_true", help="대화 기록을 요청에 담아 서버 DB 조회를 생략")
+    args = parser.parse_args()
+
+    latencies, errors, probes = [], [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_event_loop(args.url, args.probe_interval, probes, stop))
+
+    async def delayed_session(index: int):
+        if args.ramp:
+            await asyncio.sleep(args.ramp * index / args.sessions)
+        await run_session(args.url, index, args.turns, args.no_db, latencies, errors)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(delayed_session(index) for index in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    print(f"sessions: {args.sessions}, turns/session: {args.turns}, elapsed: {elapsed:.2f}s")
+    print(f"completed turns: {len(latencies)}, errors: {len(errors)}, throughput: {len(latencies) / elapsed:.2f} turns/s")
+    print(describe("turn latency", latencies))
+    print(describe("event loop probe", probes))
+    for error in errors[:5]:
+        print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,7 @@ import axios from 'axios';
 import logo from '../assets/logo.png'; // 로고 이미지 import
 import './ChatPage.css';
 import { getUserIdxFromToken } from './main/utils/authUtils';
+import { fetchAllPages } from './main/utils/pagination';
 
 function ChatPage() {
   const { chatRoomId } = useParams(); // URL에서 chatRoomId 가져오기
@@ -26,10 +27,10 @@ function ChatPage() {
       return;
     }
     try {
-      const response = await axios.get(
+      const rooms = await fetchAllPages(
         `${process.env.REACT_APP_SERVER_DOMAIN}/api/chat-room/user/${user_idx}`
       );
-      setChatRooms(response.data);
+      setChatRooms(rooms);
     } catch (error) {
       console.error('채팅방 목록 불러오기 오류:', error);
     }
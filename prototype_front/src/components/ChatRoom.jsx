@@ -20,49 +20,15 @@ const ChatRoom = ({ roomId, roomName, roomImg, onLeaveRoom }) => {
   const fetchMessages = async () => {
     try {
       const response = await axios.get(
-        `${process.env.REACT_APP_SERVER_DOMAIN}/api/chat/${roomId}`
+        `${process.env.REACT_APP_SERVER_DOMAIN}/api/chat/${roomId}/messages`,
+        { params: { limit: 100 } } // 최근 메시지 100개 (시간순)
       );
-      const logs = response.data.map((log) => ({ content: log.log }));
 
-      const parsedMessages = logs.flatMap((log) => {
-        // log.content가 없는 경우 빈 배열 반환
-        if (!log.content) {
-          console.warn('log.content가 비어 있습니다:', log);
-          return [];
-        }
-
-        const lines = log.content
-          .split('\n')
-          .filter((line) => line.trim() !== '');
-
-        // 첫 줄과 마지막 줄 제외
-        const mainLines = lines.slice(1, -1);
-
-        // 메시지 데이터로 변환
-        return mainLines
-          .map((line) => {
-            try {
-              const timestampMatch = line.match(/^\[(.*?)\]/); // 타임스탬프 추출
-              const senderMatch = line.match(/user:|chatbot:/); // 발신자 추출
-
-              if (!timestampMatch || !senderMatch) return null; // 유효하지 않은 경우 건너뜀
-
-              const timestamp = timestampMatch[1]; // 예: "2025-01-07 20:03:36"
-              const sender = line.includes('user:') ? 'user' : 'chatbot';
-              const content = line.split(': ').slice(1).join(': ').trim(); // 메시지 내용 추출
-
-              return {
-                sender,
-                content,
-                timestamp,
-              };
-            } catch (parseError) {
-              console.error('메시지 파싱 중 오류:', line, parseError);
-              return null;
-            }
-          })
-          .filter(Boolean); // null 값 제거
-      });
+      const parsedMessages = response.data.map(({ sender, content, timestamp }) => ({
+        sender,
+        content,
+        timestamp,
+      }));
 
       setMessages(parsedMessages); // 상태 업데이트
     } catch (error) {
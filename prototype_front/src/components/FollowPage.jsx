@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import CharacterModal from '../components/main/CharacterModal';
+import { fetchAllPages } from './main/utils/pagination';
 import './FollowPage.css';
 
 const FollowPage = () => {
@@ -24,7 +25,7 @@ const FollowPage = () => {
         }
         const parsedToken = JSON.parse(atob(token.split('.')[1]));
         setUserIdx(parsedToken.user_idx); // 로그인한 사용자 ID 저장
-        const response = await axios.get(
+        const characters = await fetchAllPages(
           `${process.env.REACT_APP_SERVER_DOMAIN}/api/friends/${parsedToken.user_idx}/characters`,
           {
             headers: {
@@ -32,7 +33,7 @@ const FollowPage = () => {
             },
           }
         );
-        setFollowedCharacters(response.data);
+        setFollowedCharacters(characters);
         setLoading(false);
       } catch (error) {
         console.error('팔로우한 캐릭터 불러오기 실패:', error);
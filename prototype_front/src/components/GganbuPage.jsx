@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import CharacterModal from '../components/main/CharacterModal';
+import { fetchAllPages } from './main/utils/pagination';
 import './GganbuPage.css';
 
 const GganbuPage = () => {
@@ -26,7 +27,7 @@ const GganbuPage = () => {
         );
 
         const userId = verifyResponse.data.user_idx;
-        const response = await axios.get(
+        const userCharacters = await fetchAllPages(
           `${process.env.REACT_APP_SERVER_DOMAIN}/api/characters/user/${userId}`,
           {
             headers: {
@@ -34,7 +35,7 @@ const GganbuPage = () => {
             },
           }
         );
-        setCharacters(response.data);
+        setCharacters(userCharacters);
         setLoading(false);
       } catch (error) {
         console.error('팔로우한 캐릭터 불러오기 실패:', error);
@@ -1,8 +1,8 @@
 import React, { useEffect, useState } from 'react';
 import { useSearchParams } from 'react-router-dom';
-import axios from 'axios';
 import CharacterCard from './CharacterCard';
 import CharacterModal from './CharacterModal';
+import { fetchAllPages } from './utils/pagination';
 
 const Search = () => {
   const [searchParams] = useSearchParams();
@@ -16,10 +16,10 @@ const Search = () => {
       if (!query) return;
 
       try {
-        const response = await axios.get(
+        const characters = await fetchAllPages(
           `${process.env.REACT_APP_SERVER_DOMAIN}/api/characters/`
         );
-        const filteredResults = response.data.filter(
+        const filteredResults = characters.filter(
           (character) =>
             character.char_name.toLowerCase().includes(query.toLowerCase()) ||
             character.char_description
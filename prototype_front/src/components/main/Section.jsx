@@ -3,6 +3,7 @@ import axios from 'axios';
 import './Section.css';
 import CharacterCard from './CharacterCard';
 import CharacterModal from './CharacterModal';
+import { fetchAllPages } from './utils/pagination';
 
 function SectionField({
   title,
@@ -123,18 +124,18 @@ const Section = () => {
   useEffect(() => {
     const fetchInitialData = async () => {
       try {
-        const [charactersResponse, tagsResponse, fieldsResponse] =
+        const [characters, tagsResponse, fieldsResponse] =
           await Promise.all([
-            axios.get(`${process.env.REACT_APP_SERVER_DOMAIN}/api/characters/`),
+            fetchAllPages(`${process.env.REACT_APP_SERVER_DOMAIN}/api/characters/`), // 캐릭터 목록 전체 페이지
             axios.get(`${process.env.REACT_APP_SERVER_DOMAIN}/api/tags`),
             axios.get(`${process.env.REACT_APP_SERVER_DOMAIN}/api/fields`),
           ]);
 
-        // console.log('Fetched Characters:', charactersResponse.data); // 캐릭터 데이터 로그
+        // console.log('Fetched Characters:', characters); // 캐릭터 데이터 로그
         // console.log('Fetched Tags:', tagsResponse.data); // 태그 데이터 로그
         // console.log('Fetched Fields:', fieldsResponse.data); // 필드 데이터 로그
 
-        setAllCharacters(charactersResponse.data); // 캐릭터 리스트 설정
+        setAllCharacters(characters); // 캐릭터 리스트 설정
         setTags(tagsResponse.data); // 태그 리스트 설정
         setFieldCategories(fieldsResponse.data); // 필드 리스트 설정
         setIsLoading(false); // 로딩 완료
@@ -0,0 +1,21 @@
+import axios from 'axios';
+
+// 목록 API는 한 페이지씩 반환하고, 다음 페이지 cursor를 X-Next-Cursor 헤더로 내려준다
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+
+// X-Next-Cursor를 따라가며 목록 전체를 가져온다 (요청마다 한 페이지씩).
+export const fetchAllPages = async (url, config = {}) => {
+  const items = [];
+  let cursor = null;
+
+  do {
+    const response = await axios.get(url, {
+      ...config,
+      params: { ...config.params, ...(cursor ? { cursor } : {}) },
+    });
+    items.push(...response.data);
+    cursor = response.headers[NEXT_CURSOR_HEADER];
+  } while (cursor);
+
+  return items;
+};